@@ -1,12 +1,21 @@
+import argparse
+import glob
+import io
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-csv_file=r"C:\Users\boyin\Downloads\Retail_Sales_Data.xls"
-df=pd.read_csv(csv_file)
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
-df.columns = df.columns.str.strip()
-df.drop_duplicates(inplace=True)
-df.dropna(inplace=True)  # Remove rows with missing values
+CHUNK_SIZE = 100_000
 
-df.rename(columns={
+COLUMN_RENAMES = {
     "Product_ID": "Product ID",
     "Product_Name": "Product Name",
     "Category": "Category",
@@ -14,18 +23,279 @@ df.rename(columns={
     "Description": "description",
     "Image_URL": "image",
     "Rating": "rating",
-    "product_category":"category",
+    "product_category": "category",
     "sales_revenue_(usd)": "sales_revenue",
     "marketing_spend_(usd)": "marketing_spend"
-}, inplace=True)
+}
 
-retail_cols = df.columns.tolist()
 
-df.to_csv('Retail_Sales.csv', index=False)
+class RowHashSet:
+    """Set of 64-bit row hashes stored as a few sorted numpy runs (8 bytes per row).
+
+    New hashes are appended as a run and runs of similar size are merged, so
+    inserts stay amortized O(log n) per row and lookups are binary searches.
+    Two different rows sharing a 64-bit hash would be treated as duplicates;
+    at export sizes this is vanishingly unlikely.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.unique(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newest = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], newest)
+
+    def keep_first_seen(self, hashes):
+        """Mask of rows whose hash is new, keeping the first of any repeats; records them."""
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[np.unique(hashes, return_index=True)[1]] = True
+        keep &= ~self.contains(hashes)
+        self.add(hashes[keep])
+        return keep
+
+
+def row_hashes(chunk):
+    """64-bit hash per row; numbers are hashed as float64 so 5 and 5.0 match across chunks."""
+    normalized = chunk.copy(deep=False)
+    for column in normalized.columns:
+        if pd.api.types.is_numeric_dtype(normalized[column]) and not pd.api.types.is_bool_dtype(normalized[column]):
+            normalized[column] = normalized[column].astype("float64")
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def clean_chunk(chunk, seen):
+    """Apply the cleaning steps to one chunk, dropping rows already recorded in ``seen``."""
+    chunk.columns = chunk.columns.str.strip()
+    # Rows with missing values are removed anyway, so dropping them first leaves the
+    # same first occurrences as drop_duplicates followed by dropna
+    chunk = chunk.dropna()
+    chunk = chunk[seen.keep_first_seen(row_hashes(chunk))]
+    return chunk.rename(columns=COLUMN_RENAMES)
+
+
+class ChunkWriter:
+    """Appends cleaned chunks to a Parquet file (or CSV, by extension) as they arrive.
+
+    The file schema comes from the first non-empty chunk: a chunk emptied by
+    the cleaning steps has no values to type its text columns from. If no
+    rows arrive at all, ``close`` writes an empty file with the columns of
+    the first chunk.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.csv = output_path.lower().endswith(".csv")
+        self.writer = None
+        self.schema = None
+        self.empty = None
+
+    def write(self, chunk):
+        if not len(chunk):
+            if self.empty is None:
+                self.empty = chunk
+            return
+        if self.schema is None:
+            self.schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+        self._write_table(pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+
+    def _write_table(self, table):
+        if self.writer is None:
+            self.writer = (pa_csv.CSVWriter(self.output_path, table.schema) if self.csv
+                           else pq.ParquetWriter(self.output_path, table.schema))
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None and self.empty is not None:
+            self._write_table(pa.Table.from_pandas(self.empty, preserve_index=False))
+        if self.writer is not None:
+            self.writer.close()
+
+
+def clean_retail_export(input_path, output_path="Retail_Sales.parquet", chunksize=CHUNK_SIZE, dtype=None):
+    """Stream a retail sales CSV export through the cleaning steps with bounded memory.
+
+    The input is read ``chunksize`` rows at a time, deduplicated across chunks
+    with a ``RowHashSet``, stripped of rows with missing values, renamed and
+    appended to ``output_path``. Pass ``dtype`` when a column's type cannot be
+    inferred from the first chunk. Returns row counts for logging.
+    """
+    seen = RowHashSet()
+    writer = ChunkWriter(output_path)
+    rows_read = rows_written = 0
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype=dtype):
+            rows_read += len(chunk)
+            cleaned = clean_chunk(chunk, seen)
+            writer.write(cleaned)
+            rows_written += len(cleaned)
+    finally:
+        writer.close()
+    logging.info(f"Cleaned {input_path}: {rows_read} rows read, {rows_written} rows written to {output_path}")
+    return {"rows_read": rows_read, "rows_written": rows_written}
+
+
+class _ByteRange(io.RawIOBase):
+    """Readable view of ``[start, stop)`` of a file, preceded by the CSV header line."""
+
+    def __init__(self, path, start, stop, header):
+        self.file = open(path, "rb")
+        self.file.seek(start)
+        self.remaining = stop - start
+        self.header = header
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.header:
+            data, self.header = self.header[:len(buffer)], self.header[len(buffer):]
+        else:
+            data = self.file.read(min(len(buffer), self.remaining))
+            self.remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def plan_shards(inputs, workers):
+    """Split CSV files into ``(path, start, stop, header)`` byte ranges, about ``workers`` in total.
+
+    Whole files are used when there are at least as many files as workers;
+    otherwise each file is cut at line boundaries. Quoted fields spanning
+    several lines are not supported when a file is cut.
+    """
+    shards = []
+    if not inputs:
+        return shards
+    splits = max(1, -(-workers // len(inputs)))
+    for path in inputs:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            header = f.readline()
+            start = f.tell()
+            cuts = [start]
+            for i in range(1, splits):
+                f.seek(max(start + (size - start) * i // splits, cuts[-1]))
+                if f.tell() > start:
+                    f.readline()  # move on to the next line start
+                cuts.append(min(f.tell(), size))
+            cuts.append(size)
+        shards.extend((path, lo, hi, header) for lo, hi in zip(cuts, cuts[1:]) if hi > lo)
+    return shards
+
+
+def clean_shard(task):
+    """Process-pool worker: clean one byte range into its own Parquet part.
+
+    Duplicates are removed within the shard only; the row hashes of the kept
+    rows are saved next to the part so the merge step can reconcile shards
+    without hashing again.
+    """
+    (path, start, stop, header), part_path, chunksize, dtype = task
+    seen = RowHashSet()
+    writer = ChunkWriter(part_path)
+    hashes = []
+    rows_read = 0
+    try:
+        with io.BufferedReader(_ByteRange(path, start, stop, header)) as source:
+            for chunk in pd.read_csv(source, chunksize=chunksize, dtype=dtype):
+                rows_read += len(chunk)
+                chunk.columns = chunk.columns.str.strip()
+                chunk = chunk.dropna()
+                chunk_hashes = row_hashes(chunk)
+                keep = seen.keep_first_seen(chunk_hashes)
+                writer.write(chunk[keep].rename(columns=COLUMN_RENAMES))
+                hashes.append(chunk_hashes[keep])
+    finally:
+        writer.close()
+    hashes_path = part_path + ".hashes.npy"
+    np.save(hashes_path, np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64))
+    return part_path, hashes_path, rows_read
+
+
+def clean_retail_exports_parallel(inputs, output_path="Retail_Sales.parquet", workers=None, chunksize=CHUNK_SIZE, dtype=None):
+    """Clean a directory (or list) of CSV exports across a process pool.
+
+    Inputs are sharded with ``plan_shards`` and cleaned independently by
+    ``clean_shard``. The merge step then walks the parts in input order and
+    drops rows already seen in an earlier shard, so the output equals running
+    ``clean_retail_export`` over the concatenated inputs, down to an empty
+    file with the header columns when no rows survive. Nothing is written
+    when there are no inputs at all.
+    """
+    if isinstance(inputs, str):
+        inputs = sorted(glob.glob(os.path.join(inputs, "*.csv"))) if os.path.isdir(inputs) else [inputs]
+    if not inputs:
+        logging.warning(f"No CSV exports to clean; {output_path} was not written")
+        return {"rows_read": 0, "rows_written": 0}
+    workers = workers or os.cpu_count()
+    shards = plan_shards(inputs, workers)
+    work_dir = tempfile.mkdtemp(prefix="retail_shards_", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        tasks = [(shard, os.path.join(work_dir, f"part-{i:05d}.parquet"), chunksize, dtype)
+                 for i, shard in enumerate(shards)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(clean_shard, tasks))
+
+        seen = RowHashSet()
+        writer = ChunkWriter(output_path)
+        rows_read = rows_written = 0
+        try:
+            # Header-only inputs have no shards; the empty header chunk is only written if no rows follow
+            writer.write(clean_chunk(pd.read_csv(inputs[0], nrows=0, dtype=dtype), RowHashSet()))
+            for part_path, hashes_path, shard_rows in parts:
+                rows_read += shard_rows
+                if not os.path.exists(part_path):
+                    continue
+                keep = seen.keep_first_seen(np.load(hashes_path))
+                offset = 0
+                for batch in pq.ParquetFile(part_path).iter_batches(batch_size=chunksize):
+                    rows = batch.to_pandas()[keep[offset:offset + batch.num_rows]]
+                    offset += batch.num_rows
+                    writer.write(rows)
+                    rows_written += len(rows)
+        finally:
+            writer.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    logging.info(f"Cleaned {len(inputs)} file(s) in {len(shards)} shards on {workers} workers: "
+                 f"{rows_read} rows read, {rows_written} rows written to {output_path}")
+    return {"rows_read": rows_read, "rows_written": rows_written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean a retail sales CSV export for loading into BigQuery.")
+    parser.add_argument("input", help="CSV export, or a directory of exports, to clean")
+    parser.add_argument("-o", "--output", default="Retail_Sales.parquet",
+                        help="Parquet output file (a .csv extension writes CSV instead)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows read per chunk")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 0 uses every core (directories always use the process pool)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.workers != 1 or os.path.isdir(args.input):
+        clean_retail_exports_parallel(args.input, args.output, workers=args.workers or None, chunksize=args.chunksize)
+    else:
+        clean_retail_export(args.input, args.output, chunksize=args.chunksize)
 
-# Show link to download the file
-import shutil
-from IPython.display import FileLink
 
-# Display download link
-FileLink('Retail_Sales.csv')
\ No newline at end of file
+if __name__ == "__main__":
+    main()
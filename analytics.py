@@ -0,0 +1,214 @@
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+import downsample
+from cart_engine import cart_totals
+from cube import build_cube
+from histograms import histogram_bins
+from row_index import RowIndex
+from search_index import SubstringIndex
+from time_index import TimeIndex
+
+# Frame attribute naming the data load a frame came from; set by the loaders in app.py
+DATASET_VERSION = "dataset_version"
+
+MAX_CACHE_BYTES = 256 * 2**20
+
+
+def dataset_version(frame):
+    return frame.attrs.get(DATASET_VERSION)
+
+
+def sizeof(value):
+    """Approximate memory held by a cached view result, in bytes."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class MemoCache(LRUCache):
+    """LRU cache bounded by the total ``sizeof`` of its values, with hit/miss/eviction counters."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        super().__init__(maxsize=max_bytes, getsizeof=sizeof)
+        self.hits = self.misses = self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self), "bytes": self.currsize, "max_bytes": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def _hashable(value):
+    # Widget values arrive as numpy scalars and lists
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+class AnalyticsEngine:
+    """Runs view functions through a memo cache shared by every session.
+
+    A view is a function of a dataset (``RetailData`` or ``FakeStoreData``)
+    and keyword filter parameters. Results are keyed by the view, the
+    dataset's version and the parameters, so a new data load never sees old
+    results. Cached results are shared and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.cache = MemoCache(max_bytes)
+        self._lock = threading.Lock()
+
+    def run(self, view, data, **params):
+        if data.version is None:
+            return view(data, **params)
+        key = (view.__name__, data.version, tuple(sorted((name, _hashable(value)) for name, value in params.items())))
+        with self._lock:
+            try:
+                result = self.cache[key]
+                self.cache.hits += 1
+                return result
+            except KeyError:
+                self.cache.misses += 1
+        result = view(data, **params)
+        with self._lock:
+            if sizeof(result) <= self.cache.maxsize:
+                self.cache[key] = result
+        return result
+
+    def stats(self):
+        with self._lock:
+            return self.cache.stats()
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+
+
+class RetailData:
+    """A Retail_Sales load (typed and sorted by ``sort_for_index``) with its cube, row index and time index."""
+
+    def __init__(self, frame, version=None):
+        self.frame = frame
+        self.version = version if version is not None else dataset_version(frame)
+        self.cube = build_cube(frame)
+        self.index = RowIndex(frame)
+        self.time_index = TimeIndex(frame)
+
+
+class FakeStoreData:
+    """The Fake Store products, priced cart lines and users of one API fetch."""
+
+    def __init__(self, products, carts, users, version=None):
+        self.products = products
+        self.carts = carts
+        self.users = users
+        self.version = version if version is not None else dataset_version(products)
+        self.product_search = SubstringIndex(products["Product Name"] if "Product Name" in products else [])
+
+
+# Retail views
+
+def total_sales_revenue(retail, store_location, category_contains=""):
+    return retail.cube.query(["sales_revenue"], store_location=store_location,
+                             category_contains=category_contains)["sales_revenue"].iloc[0]
+
+
+def sales_trend(retail, start_date, end_date, max_points=downsample.MAX_POINTS, granularity="D",
+                store_location=None, category=None):
+    time_series = retail.time_index.trend(start_date, end_date, granularity,
+                                          store_location=store_location, category=category)
+    return downsample.lttb(time_series, "date", "sales_revenue", max_points)
+
+
+def sales_by_product(retail, store_location):
+    return retail.cube.query(["sales_revenue"], ["product_id"], store_location=store_location)
+
+
+def category_by_location(retail, store_location):
+    return retail.cube.query(["sales_revenue"], ["category"], store_location=store_location)
+
+
+def marketing_vs_units(retail, store_location, max_points=downsample.MAX_POINTS):
+    """``(frame, binned)``: the store's points, or heatmap cells when there are more than ``max_points``."""
+    rows = retail.index.store_rows(store_location)
+    if len(rows) > max_points:
+        return downsample.bin_2d(rows, "marketing_spend", "units_sold"), True
+    return rows[["marketing_spend", "units_sold", "category"]], False
+
+
+def marketing_distribution(retail, store_location, bins=20):
+    return histogram_bins(retail.index.store_rows(store_location)["marketing_spend"], bins)
+
+
+def sales_by_weekday(retail, category=None):
+    return retail.cube.query(["sales_revenue"], ["day_of_the_week"], category=category)
+
+
+# Fake Store views
+
+def filter_products(store, search="", categories=(), min_price=None, max_price=None):
+    products = store.products
+    if search:
+        products = products.iloc[store.product_search.search(search)]
+    if categories:
+        products = products[products["Category"].isin(categories)]
+    if min_price is not None:
+        products = products[products["Price"] >= min_price]
+    if max_price is not None:
+        products = products[products["Price"] <= max_price]
+    return products
+
+
+def price_distribution(store, bins=20, **product_filters):
+    return histogram_bins(filter_products(store, **product_filters)["Price"], bins)
+
+
+def category_average_price(store, **product_filters):
+    return filter_products(store, **product_filters).groupby("Category")["Price"].mean().reset_index()
+
+
+def top_products(store, top_n=5, **product_filters):
+    return filter_products(store, **product_filters).sort_values(by="Price", ascending=False).head(top_n)
+
+
+def filter_carts(store, user=None, min_quantity=None, max_quantity=None):
+    carts = store.carts
+    if user:
+        carts = carts[carts["User ID"] == user]
+    if min_quantity is not None:
+        carts = carts[carts["Quantity"] >= min_quantity]
+    if max_quantity is not None:
+        carts = carts[carts["Quantity"] <= max_quantity]
+    return carts
+
+
+def cart_quantity_distribution(store, bins=20, **cart_filters):
+    return histogram_bins(filter_carts(store, **cart_filters)["Quantity"], bins)
+
+
+def cart_values(store):
+    return cart_totals(store.carts)
+
+
+def filter_users(store, user=None):
+    return store.users[store.users["User ID"] == user] if user else store.users
+
+
+def user_purchase_frequency(store, user=None):
+    return filter_users(store, user).groupby("User ID").size().reset_index(name="Purchase Frequency")
@@ -0,0 +1,44 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+FAKE_STORE_URL = "https://fakestoreapi.com"
+ENDPOINTS = ("products", "carts", "users")
+
+
+class FakeStoreClient:
+    """Fake Store API client sharing one pooled session across threads.
+
+    Every request carries a (connect, read) timeout. Connection errors and
+    429/5xx responses are retried with exponential backoff up to ``retries``
+    times before ``requests`` raises.
+    """
+
+    def __init__(self, base_url=FAKE_STORE_URL, timeout=(3.05, 10), retries=3, backoff_factor=0.5, pool_size=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        retry = Retry(total=retries, backoff_factor=backoff_factor,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_json(self, endpoint):
+        url = f"{self.base_url}/{endpoint}"
+        logging.info(f"Fetching Fake Store API data from {url}...")
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_all(self, endpoints=ENDPOINTS):
+        """Fetch several endpoints concurrently; returns ``{endpoint: payload}``."""
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            futures = {endpoint: pool.submit(self.get_json, endpoint) for endpoint in endpoints}
+            return {endpoint: future.result() for endpoint, future in futures.items()}
+
+    def close(self):
+        self.session.close()
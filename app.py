@@ -1,14 +1,53 @@
 import streamlit as st
 import pandas as pd
-import requests
 import os
 import logging
+import uuid
+import hashlib
+import json
 import matplotlib.pyplot as plt
 import altair as alt
 from google.cloud import bigquery
+from google.cloud import bigquery_storage
+import analytics
+from analytics import DATASET_VERSION, AnalyticsEngine, FakeStoreData, RetailData
+from api_client import FAKE_STORE_URL, FakeStoreClient
+from bigquery_loader import RETAIL_TABLE
+from cart_engine import build_cart_lines, price_cart_lines
+from data_sources import BigQuerySource, DuckDBSource
+import downsample
+from histograms import histogram_chart
+from image_cache import ThumbnailCache, placeholder_image
+from pagination import FramePages, page_count
+from refresh import RefreshScheduler
+from row_index import sort_for_index
+from schema import apply_retail_schema
+from shared_cache import SharedDatasetStore
+from snapshot import RetailSnapshot, share_snapshot
+import telemetry
+from time_index import GRANULARITIES
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Per-rerun timing spans, one JSON object per line
+telemetry.log_to()
+
+# Local Parquet snapshot of Retail_Sales; BigQuery is only asked for rows past its date watermark
+SNAPSHOT_DIR = os.environ.get("RETAIL_SNAPSHOT_DIR", "retail_snapshot")
+SNAPSHOT_MAX_AGE = int(os.environ.get("RETAIL_SNAPSHOT_MAX_AGE", 15 * 60))
+
+# Arrow files mapped by every Streamlit process on the node, so replicas share one copy of each dataset
+SHARED_CACHE_DIR = os.environ.get("RETAIL_SHARED_CACHE_DIR", "shared_cache")
+
+# Product image thumbnails, downloaded once and served from local disk
+THUMBNAIL_DIR = os.environ.get("RETAIL_THUMBNAIL_DIR", "thumbnails")
+
+# Where the snapshot's rows come from: "bigquery", or "duckdb" to query local Parquet files offline
+RETAIL_SOURCE = os.environ.get("RETAIL_SOURCE", "bigquery")
+RETAIL_PARQUET = os.environ.get("RETAIL_PARQUET", "Retail_Sales.parquet")
+
+# Cap on marks per chart; longer series are downsampled and larger scatters drawn as a heatmap
+CHART_MAX_POINTS = int(os.environ.get("RETAIL_CHART_MAX_POINTS", downsample.MAX_POINTS))
 
 # Configure Streamlit page
 st.set_page_config(page_title="Retail Data Explorer", layout="wide")
@@ -16,93 +55,181 @@ st.set_page_config(page_title="Retail Data Explorer", layout="wide")
 # Sidebar Navigation
 st.sidebar.title("📊 Dashboard Navigation")
 selected_dashboard = st.sidebar.selectbox("Select Dashboard:", ["Retail Dashboard", "Fake Store API Dashboard"])
+show_performance = st.sidebar.checkbox("Show performance panel", key="show_performance")
+trace = telemetry.start_rerun(selected_dashboard, session=st.session_state.setdefault("telemetry_session", uuid.uuid4().hex[:12]))
 
 
-# Fetch Retail Sales Data from BigQuery
-@st.cache_data
-def fetch_retail_sales():
-    try:
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = r"C:\Users\boyin\Downloads\symbolic-surf-454106-v9-e6347c5dcb60.json"
-        client = bigquery.Client()
-        query = "SELECT * FROM symbolic-surf-454106-v9.Retail_Data.Retail_Sales"
-        logging.info("Fetching Retail Sales data from BigQuery...")
-        return client.query(query).to_dataframe()
-    except Exception as e:
-        logging.error(f"Error fetching Retail Sales data: {e}")
-        st.error("Failed to fetch retail sales data. Check logs for details.")
-        return pd.DataFrame()
+# Shared BigQuery client (no spinner: these resources are also fetched from the refresh threads)
+@st.cache_resource(show_spinner=False)
+def get_bigquery_client():
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = r"C:\Users\boyin\Downloads\symbolic-surf-454106-v9-e6347c5dcb60.json"
+    return bigquery.Client()
 
-# Fetch Fake Store API Product Data
-@st.cache_data
-def fetch_product_data():
+# Storage Read API client for Arrow downloads; None falls back to paging the REST API
+@st.cache_resource(show_spinner=False)
+def get_bigquery_storage_client():
+    get_bigquery_client()  # sets the credentials path
     try:
-        url = "https://fakestoreapi.com/products"
-        logging.info("Fetching Fake Store API product data...")
-        response = requests.get(url)
-        response.raise_for_status()
-        products = response.json()
-        df = pd.DataFrame(products)
-        df.rename(columns={"id": "Product ID", "title": "Product Name", "category": "Category", "price": "Price", "image": "Product Image"}, inplace=True)
-        return df
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching Fake Store API data: {e}")
-        st.error("Failed to fetch product data from Fake Store API. Check logs for details.")
-        return pd.DataFrame()
-
-@st.cache_data
-def fetch_cart_data():
-    try:
-        url = "https://fakestoreapi.com/carts"
-        logging.info("Fetching Fake Store API cart data...")
-        response = requests.get(url)
-        response.raise_for_status()
-        carts = response.json()
-        df = pd.DataFrame(carts)
-
-        # Normalize the 'products' column to create individual product rows
-        products_df = pd.json_normalize(df['products'].explode())
-
-        # Merge the 'products' DataFrame back to the cart DataFrame
-        df = df.drop(columns=['products']).join(products_df)
-
-        # Rename columns to match product data
-        df.rename(columns={"id": "Cart ID", "userId": "User ID", "quantity": "Quantity", "price": "Product Price", 
-                           "title": "Product Name"}, inplace=True)
-
-        # Ensure 'Product ID' column exists
-        df["Product ID"] = df["Cart ID"]  # Or adjust based on how 'Product ID' is identified
-
-        return df
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching Fake Store API cart data: {e}")
-        st.error("Failed to fetch cart data from Fake Store API. Check logs for details.")
-        return pd.DataFrame()
-
-# Fetch Fake Store User Data
-@st.cache_data
-def fetch_user_data():
-    try:
-        url = "https://fakestoreapi.com/users"
-        logging.info("Fetching Fake Store API user data...")
-        response = requests.get(url)
-        response.raise_for_status()
-        users = response.json()
-        df = pd.DataFrame(users)
-        df.rename(columns={"id": "User ID", "name": "Name", "email": "Email", "address": "Address"}, inplace=True)
-        return df
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching Fake Store API user data: {e}")
-        st.error("Failed to fetch user data from Fake Store API. Check logs for details.")
-        return pd.DataFrame()
+        return bigquery_storage.BigQueryReadClient()
+    except Exception as e:
+        logging.warning(f"BigQuery Storage API unavailable, downloading over REST: {e}")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def get_shared_store():
+    return SharedDatasetStore(SHARED_CACHE_DIR)
+
+@st.cache_resource(show_spinner=False)
+def get_retail_snapshot():
+    return RetailSnapshot(SNAPSHOT_DIR)
+
+# Retail Sales source selected by RETAIL_SOURCE; both answer the same incremental snapshot fetch
+@st.cache_resource(show_spinner=False)
+def get_retail_source():
+    if RETAIL_SOURCE == "duckdb":
+        return DuckDBSource(RETAIL_PARQUET)
+    return BigQuerySource(get_bigquery_client(), RETAIL_TABLE, bqstorage_client=get_bigquery_storage_client())
+
+# Fetch Retail Sales rows newer than the snapshot watermark (the full table on first load).
+# Only the dashboard columns are selected, and the result streams in as Arrow batches
+# that convert to categoricals without a row-wise pass.
+def fetch_retail_sales_since(watermark):
+    source = get_retail_source()
+    logging.info(f"Fetching Retail Sales data from {source.name} newer than {watermark}...")
+    with telemetry.current_trace().span("fetch", source.name, watermark=watermark):
+        return source.fetch_since(watermark)
+
+# Build the Retail dataset from the local snapshot, topping the snapshot up from the retail source when stale.
+# Runs on the refresh scheduler's threads: failures are raised so the last good version stays in place.
+# The typed, read-only frame is shared by all sessions instead of being copied into each rerun,
+# and is sorted by store and category so the row index can slice it.
+@telemetry.traced_job("refresh:retail")
+def load_retail_data(current):
+    snapshot = get_retail_snapshot()
+
+    # One process on the node tops the snapshot up; the others wait for it and then find it fresh
+    def refresh():
+        if snapshot.is_stale(SNAPSHOT_MAX_AGE):
+            try:
+                added = snapshot.refresh(fetch_retail_sales_since)
+                logging.info(f"Retail Sales snapshot refreshed. New rows: {added}")
+            except Exception as e:
+                logging.error(f"Error fetching Retail Sales data: {e}")
+                if snapshot.is_empty() or current is not None:
+                    raise
+                logging.warning(f"Loading the last local snapshot of retail sales data; refresh from {get_retail_source().name} failed.")
+
+    version, frames = share_snapshot(snapshot, get_shared_store(), "retail", refresh,
+                                     lambda rows: {"sales": apply_retail_schema(sort_for_index(rows))},
+                                     current_version=current.version if current is not None else None)
+    if frames is None:
+        return current
+    sales_data = frames["sales"]
+    sales_data.attrs[DATASET_VERSION] = version
+    return RetailData(sales_data)
+
+# Shared Fake Store API client (pooled connections, timeouts and retries)
+@st.cache_resource(show_spinner=False)
+def get_fake_store_client():
+    return FakeStoreClient(os.environ.get("FAKE_STORE_URL", FAKE_STORE_URL))
+
+# Product image thumbnails on local disk, downloaded over their own short-timeout session without retries
+@st.cache_resource(show_spinner=False)
+def get_thumbnail_cache():
+    return ThumbnailCache(THUMBNAIL_DIR)
+
+# Fake Store API Product Data
+def build_product_data(products):
+    df = pd.DataFrame(products)
+    df.rename(columns={"id": "Product ID", "title": "Product Name", "category": "Category", "price": "Price", "image": "Product Image"}, inplace=True)
+    return df
+
+# Fake Store API Cart Data: one row per (cart, product), priced from the product catalog
+def build_cart_data(carts, products):
+    return price_cart_lines(build_cart_lines(carts), products)
+
+# Fake Store User Data
+def build_user_data(users):
+    df = pd.DataFrame(users)
+    df.rename(columns={"id": "User ID", "name": "Name", "email": "Email", "address": "Address"}, inplace=True)
+    return df
+
+# Fetch products, carts and users from the Fake Store API concurrently
+def fetch_fake_store_frames():
+    with telemetry.current_trace().span("fetch", "fake_store_api"):
+        payloads = get_fake_store_client().fetch_all()
+    version = "fake_store:" + hashlib.sha1(json.dumps(payloads, sort_keys=True).encode()).hexdigest()[:12]
+    products = build_product_data(payloads["products"])
+    return version, {"products": products, "carts": build_cart_data(payloads["carts"], products),
+                     "users": build_user_data(payloads["users"])}
+
+# Runs on the refresh scheduler's threads; only one process on the node calls the API per refresh
+@telemetry.traced_job("refresh:fake_store")
+def load_fake_store_data(current):
+    version, frames = get_shared_store().fetch_shared("fake_store", SNAPSHOT_MAX_AGE, fetch_fake_store_frames)
+    if current is not None and current.version == version:
+        return current
+    for frame in frames.values():
+        frame.attrs[DATASET_VERSION] = version
+    if "Product Image" in frames["products"]:
+        get_thumbnail_cache().prefetch_in_background(frames["products"]["Product Image"])
+    return FakeStoreData(frames["products"], frames["carts"], frames["users"])
+
+# Both data sources, preloaded when the server starts and reloaded in the background once stale;
+# sessions are served the current version meanwhile, and the last good one if a reload fails
+@st.cache_resource
+def get_refresh_scheduler():
+    scheduler = RefreshScheduler(max_age=SNAPSHOT_MAX_AGE)
+    scheduler.register("retail", load_retail_data)
+    scheduler.register("fake_store", load_fake_store_data)
+    scheduler.preload()
+    scheduler.start()
+    return scheduler
+
+def get_dataset(name):
+    scheduler = get_refresh_scheduler()
+    with trace.cache_lookup(name):
+        if not scheduler.is_ready(name):
+            trace.mark_cache_miss()
+        return scheduler.get(name)
+
+# View results shared by all sessions, keyed by view, dataset version and filters
+@st.cache_resource
+def get_analytics_engine():
+    return AnalyticsEngine()
+
+# Start loading both sources on the server's first script run, whichever page it is for
+get_refresh_scheduler()
+
+# Shared pagination controls; only the requested page is materialized
+def show_paginated(pages, key):
+    rows_per_page = st.slider("Rows per Page", min_value=5, max_value=50, value=10, step=5, key=f"{key}_rows")
+    total_rows = pages.count()
+    total_pages = page_count(total_rows, rows_per_page)
+    page_number = st.number_input("Page Number", min_value=1, max_value=total_pages, value=1, step=1, key=f"{key}_page")
+
+    with trace.span("filter", f"{key}_page"):
+        page = pages.page(page_number, rows_per_page)
+    with trace.span("render", f"{key}_table"):
+        st.dataframe(page)
+    st.write(f"Page {page_number} of {total_pages} | Total Rows: {total_rows}")
 
 # Load Data Based on Selected Dashboard
 if selected_dashboard == "Retail Dashboard":
     st.title("🚀 Retail Data Explorer")
     st.subheader("Retail Analytics Dashboard for Sales, Marketing, and Performance Optimization")
 
-    sales_data = fetch_retail_sales()
-    if sales_data.empty:
+    try:
+        retail = get_dataset("retail")
+    except Exception as e:
+        logging.error(f"Error fetching Retail Sales data: {e}")
+        st.error("Failed to fetch retail sales data. Check logs for details.")
         st.stop()
+    if get_refresh_scheduler().last_error("retail"):
+        st.warning(f"Showing the last loaded retail sales data; refresh from {get_retail_source().name} failed.")
+    sales_data = retail.frame
+    retail_index = retail.index
+    engine = get_analytics_engine()
 
     # Sidebar Buttons for Retail Graphs
     graph_button = st.sidebar.radio("Select Graph", [
@@ -123,16 +250,14 @@ if selected_dashboard == "Retail Dashboard":
 
         try:
             with col1:
-                selected_store = st.selectbox("Filter by Store Location", sales_data["store_location"].unique())
+                selected_store = st.selectbox("Filter by Store Location", retail_index.stores)
 
             with col2:
                 search_category = st.text_input("Search by Category").strip().lower()
 
-            total_sales_filtered = sales_data[sales_data["store_location"] == selected_store]
-            if search_category:
-                total_sales_filtered = total_sales_filtered[total_sales_filtered["category"].str.lower().str.contains(search_category, na=False)]
-
-            total_sales = total_sales_filtered["sales_revenue"].sum()
+            with trace.span("aggregate", "total_sales_revenue"):
+                total_sales = engine.run(analytics.total_sales_revenue, retail, store_location=selected_store,
+                                         category_contains=search_category)
             st.metric(label="Total Revenue", value=f"${total_sales:,.2f}")
         except Exception as e:
             logging.error(f"Error calculating total sales revenue: {e}")
@@ -144,16 +269,28 @@ if selected_dashboard == "Retail Dashboard":
         try:
             col1, col2 = st.columns(2)
             with col1:
-                start_date = st.date_input("Select Start Date", pd.to_datetime(sales_data["date"]).min())
+                start_date = st.date_input("Select Start Date", sales_data["date"].min().date())
             with col2:
-                end_date = st.date_input("Select End Date", pd.to_datetime(sales_data["date"]).max())
-
-            sales_data["date"] = pd.to_datetime(sales_data["date"])
-            sales_trend_filtered = sales_data[(sales_data["date"] >= pd.to_datetime(start_date)) & (sales_data["date"] <= pd.to_datetime(end_date))]
-
-            time_series = sales_trend_filtered.groupby("date")["sales_revenue"].sum().reset_index()
-            time_chart = alt.Chart(time_series).mark_line().encode(x="date:T", y="sales_revenue:Q").properties(width=700)
-            st.altair_chart(time_chart, use_container_width=True)
+                end_date = st.date_input("Select End Date", sales_data["date"].max().date())
+            # Widgets take plain labels, mapped here to the time index granularity and series
+            col3, col4 = st.columns(2)
+            with col3:
+                granularities = {label: code for code, label in GRANULARITIES.items()}
+                granularity = granularities[st.radio("Granularity", list(granularities), horizontal=True)]
+            with col4:
+                trend_series = {"All Stores": {}}
+                trend_series.update({f"Store: {store}": {"store_location": store} for store in retail_index.stores})
+                trend_series.update({f"Category: {category}": {"category": category}
+                                     for category in retail.time_index.labels("category")})
+                trend_for = st.selectbox("Trend For", list(trend_series))
+
+            with trace.span("aggregate", "sales_trend"):
+                time_series = engine.run(analytics.sales_trend, retail, start_date=start_date, end_date=end_date,
+                                         max_points=CHART_MAX_POINTS, granularity=granularity,
+                                         **trend_series[trend_for])
+            with trace.span("render", "sales_trend"):
+                time_chart = alt.Chart(time_series).mark_line().encode(x="date:T", y="sales_revenue:Q").properties(width=700)
+                st.altair_chart(time_chart, use_container_width=True)
         except Exception as e:
             logging.error(f"Error generating sales trend chart: {e}")
             st.error("Failed to generate sales trend chart.")
@@ -161,10 +298,10 @@ if selected_dashboard == "Retail Dashboard":
     # New: Sales Revenue by Product ID
     elif graph_button == "Sales Revenue by Product ID":
         st.subheader("🏷️ Sales Revenue by Product ID")
-        selected_store_product = st.selectbox("Filter by Store Location for Product Sales", sales_data["store_location"].unique(), key="product_store")
+        selected_store_product = st.selectbox("Filter by Store Location for Product Sales", retail_index.stores, key="product_store")
 
-        product_filtered = sales_data[sales_data["store_location"] == selected_store_product]
-        product_sales = product_filtered.groupby("product_id")["sales_revenue"].sum().reset_index()
+        with trace.span("aggregate", "sales_by_product"):
+            product_sales = engine.run(analytics.sales_by_product, retail, store_location=selected_store_product)
 
         product_chart = alt.Chart(product_sales).mark_bar().encode(
             x="sales_revenue:Q",
@@ -173,15 +310,16 @@ if selected_dashboard == "Retail Dashboard":
             tooltip=["product_id", "sales_revenue"]
         ).properties(width=700, height=400)
 
-        st.altair_chart(product_chart, use_container_width=True)
+        with trace.span("render", "sales_by_product"):
+            st.altair_chart(product_chart, use_container_width=True)
 
     # Category-wise Sales by Location (Pie Chart)
     elif graph_button == "Category-wise Sales by Location":
         st.subheader("📊 Category-wise Sales by Location")
-        selected_store_pie = st.selectbox("Filter Pie Chart by Store Location", sales_data["store_location"].unique(), key="pie_store")
+        selected_store_pie = st.selectbox("Filter Pie Chart by Store Location", retail_index.stores, key="pie_store")
 
-        pie_filtered = sales_data[sales_data["store_location"] == selected_store_pie]
-        category_pie = pie_filtered.groupby("category")["sales_revenue"].sum().reset_index()
+        with trace.span("aggregate", "category_by_location"):
+            category_pie = engine.run(analytics.category_by_location, retail, store_location=selected_store_pie)
 
         pie_chart = alt.Chart(category_pie).mark_arc().encode(
             theta="sales_revenue:Q",
@@ -189,56 +327,64 @@ if selected_dashboard == "Retail Dashboard":
             tooltip=["category", "sales_revenue"]
         ).properties(width=300, height=300)
         
-        st.altair_chart(pie_chart, use_container_width=True)
+        with trace.span("render", "category_by_location"):
+            st.altair_chart(pie_chart, use_container_width=True)
 
     # Units Sold vs. Marketing Spend Scatter Plot
     elif graph_button == "Marketing Spend vs. Units Sold":
         st.subheader("📢 Marketing Spend vs. Units Sold")
 
         # Select store for filtering (Only one dropdown)
-        selected_store_marketing_units = st.selectbox("Select Store Location", sales_data["store_location"].unique(), key="marketing_units_store")
-
-        # Filter data
-        filtered_data = sales_data[sales_data["store_location"] == selected_store_marketing_units]
-
-        # Create scatter plot
-        scatter_plot = alt.Chart(filtered_data).mark_circle(size=60).encode(
-            x=alt.X("marketing_spend:Q", title="Marketing Spend (USD)"),
-            y=alt.Y("units_sold:Q", title="Units Sold"),
-            color=alt.Color("category:N", legend=None),
-            tooltip=["category", "marketing_spend", "units_sold"]
-        ).properties(width=700, height=400)
+        selected_store_marketing_units = st.selectbox("Select Store Location", retail_index.stores, key="marketing_units_store")
+
+        # Filter data, binning it into heatmap cells when there are too many points to draw
+        with trace.span("aggregate", "marketing_vs_units"):
+            marketing_units, binned = engine.run(analytics.marketing_vs_units, retail,
+                                                 store_location=selected_store_marketing_units, max_points=CHART_MAX_POINTS)
+
+        # Create scatter plot, or a heatmap of the binned counts
+        if binned:
+            scatter_plot = alt.Chart(marketing_units).mark_rect().encode(
+                x=alt.X("marketing_spend_start:Q", bin="binned", title="Marketing Spend (USD)"),
+                x2="marketing_spend_end:Q",
+                y=alt.Y("units_sold_start:Q", bin="binned", title="Units Sold"),
+                y2="units_sold_end:Q",
+                color=alt.Color("count:Q", title="Rows"),
+                tooltip=["marketing_spend_start", "marketing_spend_end", "units_sold_start", "units_sold_end", "count"]
+            ).properties(width=700, height=400)
+            st.caption(f"{marketing_units['count'].sum():,} rows binned into a heatmap.")
+        else:
+            scatter_plot = alt.Chart(marketing_units).mark_circle(size=60).encode(
+                x=alt.X("marketing_spend:Q", title="Marketing Spend (USD)"),
+                y=alt.Y("units_sold:Q", title="Units Sold"),
+                color=alt.Color("category:N", legend=None),
+                tooltip=["category", "marketing_spend", "units_sold"]
+            ).properties(width=700, height=400)
 
-        st.altair_chart(scatter_plot, use_container_width=True)
+        with trace.span("render", "marketing_vs_units"):
+            st.altair_chart(scatter_plot, use_container_width=True)
 
     # Marketing Spend Distribution
     elif graph_button == "Marketing Spend Distribution":
         st.subheader("🔄 Marketing Spend Distribution")
-        selected_store_marketing = st.selectbox("Filter by Store Location for Marketing Spend", sales_data["store_location"].unique(), key="marketing_store")
-
-        marketing_filtered = sales_data[sales_data["store_location"] == selected_store_marketing]
+        selected_store_marketing = st.selectbox("Filter by Store Location for Marketing Spend", retail_index.stores, key="marketing_store")
 
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.hist(marketing_filtered["marketing_spend"], bins=20, color="skyblue", edgecolor="black")
-        ax.set_xlabel("Marketing Spend (USD)")
-        ax.set_ylabel("Frequency")
-        st.pyplot(fig)
+        with trace.span("aggregate", "marketing_distribution"):
+            marketing_bins = engine.run(analytics.marketing_distribution, retail, store_location=selected_store_marketing)
+        with trace.span("render", "marketing_distribution"):
+            st.altair_chart(histogram_chart(marketing_bins, "Marketing Spend (USD)"), use_container_width=True)
 
     # Sales Distribution Across Days of the Week with Category Filter
     elif graph_button == "Sales Distribution by Day of the Week":
         st.subheader("📅 Sales Distribution by Day of the Week")
 
         # Dropdown to select category
-        selected_category = st.selectbox("Filter by Category", ["All"] + list(sales_data["category"].unique()), key="day_category")
-
-        # Filter data based on selected category
-        if selected_category != "All":
-            filtered_sales = sales_data[sales_data["category"] == selected_category]
-        else:
-            filtered_sales = sales_data.copy()
+        selected_category = st.selectbox("Filter by Category", ["All"] + retail_index.categories, key="day_category")
 
-        # Aggregate sales revenue by day of the week
-        sales_by_day = filtered_sales.groupby("day_of_the_week")["sales_revenue"].sum().reset_index()
+        # Aggregate sales revenue by day of the week for the selected category
+        with trace.span("aggregate", "sales_by_weekday"):
+            sales_by_day = engine.run(analytics.sales_by_weekday, retail,
+                                      category=None if selected_category == "All" else selected_category)
 
         # Create bar chart
         sales_by_day_chart = alt.Chart(sales_by_day).mark_bar().encode(
@@ -249,26 +395,17 @@ if selected_dashboard == "Retail Dashboard":
             tooltip=["day_of_the_week", "sales_revenue"]
         ).properties(width=700, height=400)
 
-        st.altair_chart(sales_by_day_chart, use_container_width=True)
+        with trace.span("render", "sales_by_weekday"):
+            st.altair_chart(sales_by_day_chart, use_container_width=True)
     
     # Filtered Data Preview with Pagination
     elif graph_button == "Filtered Data Preview":
         st.subheader("📋 Filtered Data Preview")
-        selected_store_preview = st.selectbox("Filter Data Preview by Store Location", sales_data["store_location"].unique(), key="preview_store")
-        filtered_preview = sales_data[sales_data["store_location"] == selected_store_preview]
+        selected_store_preview = st.selectbox("Filter Data Preview by Store Location", retail_index.stores, key="preview_store")
+        with trace.span("filter", "data_preview"):
+            filtered_preview = retail_index.store_rows(selected_store_preview)
 
-        # Pagination Controls
-        rows_per_page = st.slider("Rows per Page", min_value=5, max_value=50, value=10, step=5)
-        total_pages = (len(filtered_preview) // rows_per_page) + (1 if len(filtered_preview) % rows_per_page != 0 else 0)
-        page_number = st.number_input("Page Number", min_value=1, max_value=total_pages, value=1, step=1)
-
-        # Paginate Data
-        start_idx = (page_number - 1) * rows_per_page
-        end_idx = start_idx + rows_per_page
-        paginated_data = filtered_preview.iloc[start_idx:end_idx]
-
-        st.dataframe(paginated_data)
-        st.write(f"Page {page_number} of {total_pages} | Total Rows: {len(filtered_preview)}")
+        show_paginated(FramePages(filtered_preview), key="preview")
 
 
 elif selected_dashboard == "Fake Store API Dashboard":
@@ -276,12 +413,17 @@ elif selected_dashboard == "Fake Store API Dashboard":
     st.subheader("Analyze Product, Cart, and User Data from Fake Store API")
 
     # Fetch Data
-    fake_store_data = fetch_product_data() 
-    cart_data = fetch_cart_data()
-    user_data = fetch_user_data()
+    try:
+        fake_store = get_dataset("fake_store")
+    except Exception as e:
+        logging.error(f"Error fetching Fake Store API data: {e}")
+        st.error("Failed to fetch data from Fake Store API. Check logs for details.")
+        st.stop()
+    fake_store_data, cart_data, user_data = fake_store.products, fake_store.carts, fake_store.users
 
     if fake_store_data.empty or cart_data.empty or user_data.empty:
         st.stop()
+    engine = get_analytics_engine()
 
     # Sidebar for selecting the data type (Products, Cart, Users, Merged Data)
     selected_table = st.sidebar.radio("Select Table", ["Products", "Cart", "Users"])
@@ -306,17 +448,16 @@ elif selected_dashboard == "Fake Store API Dashboard":
                                                 value=(float(fake_store_data["Price"].min()), float(fake_store_data["Price"].max())))
 
             # Filter data based on user input
-            filtered_data = fake_store_data.copy()
-            if search_product:
-                filtered_data = filtered_data[filtered_data["Product Name"].str.lower().str.contains(search_product, na=False)]
-            if selected_categories:
-                filtered_data = filtered_data[filtered_data["Category"].isin(selected_categories)]
-            filtered_data = filtered_data[(filtered_data["Price"] >= min_price) & (filtered_data["Price"] <= max_price)]
+            product_filters = {"search": search_product, "categories": selected_categories,
+                               "min_price": min_price, "max_price": max_price}
+            with trace.span("filter", "products"):
+                filtered_data = engine.run(analytics.filter_products, fake_store, **product_filters)
 
         except Exception as e:
             logging.error(f"Error in applying filters: {e}")
             st.error(f"Error: {e}")
             filtered_data = fake_store_data  # Default to original data if there's an error
+            product_filters = {}
 
         # Graph selection for Products
         graph_button_fs = st.radio("Select Graph", [
@@ -328,43 +469,45 @@ elif selected_dashboard == "Fake Store API Dashboard":
 
         if graph_button_fs == "Price Distribution":
             st.subheader("💰 Price Distribution of Filtered Products")
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.hist(filtered_data["Price"], bins=20, color="skyblue", edgecolor="black")
-            ax.set_xlabel("Price")
-            ax.set_ylabel("Frequency")
-            st.pyplot(fig)
+            with trace.span("aggregate", "price_distribution"):
+                price_bins = engine.run(analytics.price_distribution, fake_store, **product_filters)
+            with trace.span("render", "price_distribution"):
+                st.altair_chart(histogram_chart(price_bins, "Price"), use_container_width=True)
 
         elif graph_button_fs == "Category-wise Average Price":
             st.subheader("📊 Category-wise Average Price")
-            category_avg_price = filtered_data.groupby("Category")["Price"].mean().reset_index()
+            with trace.span("aggregate", "category_average_price"):
+                category_avg_price = engine.run(analytics.category_average_price, fake_store, **product_filters)
             avg_price_chart = alt.Chart(category_avg_price).mark_bar().encode(
                 x=alt.X("Price:Q", title="Average Price (USD)"),
                 y=alt.Y("Category:N", sort="-x"),
                 color=alt.Color("Category:N", legend=None),
                 tooltip=["Category", "Price"]
             ).properties(width=700, height=400)
-            st.altair_chart(avg_price_chart, use_container_width=True)
+            with trace.span("render", "category_average_price"):
+                st.altair_chart(avg_price_chart, use_container_width=True)
 
         elif graph_button_fs == "Top Expensive Products Showcase":
             st.subheader("🏆 Top Expensive Products Showcase")
             top_n = st.slider("Select Number of Top Products", min_value=3, max_value=15, value=5, step=1)
-            top_products = filtered_data.sort_values(by="Price", ascending=False).head(top_n)
+            top_products = engine.run(analytics.top_products, fake_store, top_n=top_n, **product_filters)
+            # Local thumbnails only (prefetched when the catalog loaded); any still missing are fetched in
+            # the background and shown as a placeholder, so the layout never waits on the image host
+            with trace.span("fetch", "thumbnails"):
+                thumbnail_cache = get_thumbnail_cache()
+                thumbnails = thumbnail_cache.cached(top_products["Product Image"])
+                missing = [url for url, path in thumbnails.items() if path is None]
+                if missing:
+                    thumbnail_cache.prefetch_in_background(missing)
             cols = st.columns(len(top_products))
             for i, row in top_products.iterrows():
                 with cols[i % len(cols)]:
-                    st.image(row["Product Image"], width=150, caption=f"{row['Product Name']} \n💲{row['Price']:.2f}")
+                    st.image(thumbnails.get(row["Product Image"]) or placeholder_image(), width=150,
+                             caption=f"{row['Product Name']} \n💲{row['Price']:.2f}")
 
         elif graph_button_fs == "Filtered Product Catalog":
             st.subheader("📋 Filtered Product Catalog with Pagination")
-            rows_per_page_fs = st.slider("Rows per Page", min_value=5, max_value=50, value=10, step=5, key="fs_rows")
-            total_pages_fs = (len(filtered_data) // rows_per_page_fs) + (1 if len(filtered_data) % rows_per_page_fs != 0 else 0)
-            page_number_fs = st.number_input("Page Number", min_value=1, max_value=total_pages_fs, value=1, step=1, key="fs_page")
-            start_idx_fs = (page_number_fs - 1) * rows_per_page_fs
-            end_idx_fs = start_idx_fs + rows_per_page_fs
-            paginated_data_fs = filtered_data.iloc[start_idx_fs:end_idx_fs]
-
-            st.dataframe(paginated_data_fs)
-            st.write(f"Page {page_number_fs} of {total_pages_fs} | Total Rows: {len(filtered_data)}")
+            show_paginated(FramePages(filtered_data), key="fs")
 
     elif selected_table == "Cart":
         st.subheader("🛒 Cart Data")
@@ -383,15 +526,15 @@ elif selected_dashboard == "Fake Store API Dashboard":
                                                         value=(int(cart_data["Quantity"].min()), int(cart_data["Quantity"].max())))
 
             # Filter data based on user input
-            filtered_cart_data = cart_data.copy()
-            if selected_user:
-                filtered_cart_data = filtered_cart_data[filtered_cart_data["User ID"] == selected_user]
-            filtered_cart_data = filtered_cart_data[(filtered_cart_data["Quantity"] >= min_quantity) & (filtered_cart_data["Quantity"] <= max_quantity)]
+            cart_filters = {"user": selected_user, "min_quantity": min_quantity, "max_quantity": max_quantity}
+            with trace.span("filter", "cart"):
+                filtered_cart_data = engine.run(analytics.filter_carts, fake_store, **cart_filters)
 
         except Exception as e:
             logging.error(f"Error in applying filters: {e}")
             st.error(f"Error: {e}")
             filtered_cart_data = cart_data  # Default to original data if there's an error
+            cart_filters = {}
 
         # Graph selection for Cart
         graph_button_cart = st.radio("Select Graph", [
@@ -402,24 +545,15 @@ elif selected_dashboard == "Fake Store API Dashboard":
         # Cart Quantity Distribution
         if graph_button_cart == "Cart Quantity Distribution":
             st.subheader("📊 Cart Quantity Distribution")
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.hist(filtered_cart_data["Quantity"], bins=20, color="skyblue", edgecolor="black")
-            ax.set_xlabel("Quantity")
-            ax.set_ylabel("Frequency")
-            st.pyplot(fig)
+            with trace.span("aggregate", "cart_quantity_distribution"):
+                quantity_bins = engine.run(analytics.cart_quantity_distribution, fake_store, **cart_filters)
+            with trace.span("render", "cart_quantity_distribution"):
+                st.altair_chart(histogram_chart(quantity_bins, "Quantity"), use_container_width=True)
 
         # Filtered Cart Data with Pagination
         elif graph_button_cart == "Filtered Cart Data":
             st.subheader("📋 Filtered Cart Data with Pagination")
-            rows_per_page_cart = st.slider("Rows per Page", min_value=5, max_value=50, value=10, step=5, key="cart_rows")
-            total_pages_cart = (len(filtered_cart_data) // rows_per_page_cart) + (1 if len(filtered_cart_data) % rows_per_page_cart != 0 else 0)
-            page_number_cart = st.number_input("Page Number", min_value=1, max_value=total_pages_cart, value=1, step=1, key="cart_page")
-            start_idx_cart = (page_number_cart - 1) * rows_per_page_cart
-            end_idx_cart = start_idx_cart + rows_per_page_cart
-            paginated_cart_data = filtered_cart_data.iloc[start_idx_cart:end_idx_cart]
-
-            st.dataframe(paginated_cart_data)
-            st.write(f"Page {page_number_cart} of {total_pages_cart} | Total Rows: {len(filtered_cart_data)}")
+            show_paginated(FramePages(filtered_cart_data), key="cart")
 
 
     # User Data
@@ -433,13 +567,12 @@ elif selected_dashboard == "Fake Store API Dashboard":
             selected_user = st.selectbox("Select User", user_data["User ID"].unique(), index=0)
 
             # Filter data based on user input
-            filtered_user_data = user_data.copy()
-            if selected_user:
-                filtered_user_data = filtered_user_data[filtered_user_data["User ID"] == selected_user]
+            filtered_user_data = engine.run(analytics.filter_users, fake_store, user=selected_user)
 
         except Exception as e:
             logging.error(f"Error in applying filter: {e}")
             st.error(f"Error: {e}")
+            selected_user = None
             filtered_user_data = user_data  # Default to original data if there's an error
 
         # Graph selection for User Data
@@ -451,30 +584,52 @@ elif selected_dashboard == "Fake Store API Dashboard":
         # User Purchase Frequency
         if graph_button_users == "User Purchase Frequency":
             st.subheader("📊 User Purchase Frequency")
-            user_purchase_freq = filtered_user_data.groupby("User ID").size().reset_index(name='Purchase Frequency')
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.bar(user_purchase_freq["User ID"], user_purchase_freq["Purchase Frequency"], color="lightblue")
-            ax.set_xlabel("User ID")
-            ax.set_ylabel("Purchase Frequency")
-            ax.set_title("Purchase Frequency by User")
-            ax.tick_params(axis="x", rotation=45)  # Rotate for readability
-            st.pyplot(fig)
+            with trace.span("aggregate", "user_purchase_frequency"):
+                user_purchase_freq = engine.run(analytics.user_purchase_frequency, fake_store, user=selected_user)
+            with trace.span("render", "user_purchase_frequency"):
+                fig, ax = plt.subplots(figsize=(8, 4))
+                ax.bar(user_purchase_freq["User ID"], user_purchase_freq["Purchase Frequency"], color="lightblue")
+                ax.set_xlabel("User ID")
+                ax.set_ylabel("Purchase Frequency")
+                ax.set_title("Purchase Frequency by User")
+                ax.tick_params(axis="x", rotation=45)  # Rotate for readability
+                st.pyplot(fig)
+                plt.close(fig)  # release the figure now instead of leaving it to pyplot's registry
 
         # User Cart Value Distribution
         elif graph_button_users == "User Cart Value Distribution":
             st.subheader("💰 User Cart Value Distribution")
-            # You would need cart or product data to plot cart values, not user data
-            # Placeholder plot for now, replace with actual cart data later
-            st.write("Cart value distribution plot would need product/cart data.")
-            
+            with trace.span("aggregate", "user_cart_values"):
+                cart_values = engine.run(analytics.cart_values, fake_store)
+            selected_carts = cart_values[cart_values["User ID"].isin(filtered_user_data["User ID"])]
+            st.metric(label="Total Cart Value", value=f"${selected_carts['Cart Value'].sum():,.2f}")
+
+            # Value of every cart, with the selected user's carts highlighted (the cached frame is left untouched)
+            cart_values = cart_values.assign(**{"Selected User": cart_values["User ID"].isin(filtered_user_data["User ID"])})
+            cart_value_chart = alt.Chart(cart_values).mark_bar().encode(
+                x=alt.X("Cart ID:O", title="Cart ID"),
+                y=alt.Y("Cart Value:Q", title="Cart Value (USD)"),
+                color=alt.Color("Selected User:N", legend=None),
+                tooltip=["Cart ID", "User ID", "Items", "Cart Value"]
+            ).properties(width=700, height=400)
+            with trace.span("render", "user_cart_values"):
+                st.altair_chart(cart_value_chart, use_container_width=True)
+
         # Pagination for filtered User Data
         st.subheader("📋 Filtered User Data with Pagination")
-        rows_per_page_user = st.slider("Rows per Page", min_value=5, max_value=50, value=10, step=5, key="user_rows")
-        total_pages_user = (len(filtered_user_data) // rows_per_page_user) + (1 if len(filtered_user_data) % rows_per_page_user != 0 else 0)
-        page_number_user = st.number_input("Page Number", min_value=1, max_value=total_pages_user, value=1, step=1, key="user_page")
-        start_idx_user = (page_number_user - 1) * rows_per_page_user
-        end_idx_user = start_idx_user + rows_per_page_user
-        paginated_user_data = filtered_user_data.iloc[start_idx_user:end_idx_user]
-
-        st.dataframe(paginated_user_data)
-        st.write(f"Page {page_number_user} of {total_pages_user} | Total Rows: {len(filtered_user_data)}")
\ No newline at end of file
+        show_paginated(FramePages(filtered_user_data), key="user")
+
+# Timing breakdown of this rerun and cache hit/miss counts
+rerun_ms = trace.finish()
+if show_performance:
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.metric("Last rerun", f"{rerun_ms:,.1f} ms")
+        st.dataframe(trace.breakdown(), hide_index=True)
+        st.dataframe(trace.cache_table(), hide_index=True)
+        st.dataframe(pd.DataFrame(get_refresh_scheduler().status()), hide_index=True)
+        engine_stats = get_analytics_engine().stats()
+        st.caption(f"Analytics cache: {engine_stats['entries']} views, {engine_stats['bytes'] / 2**20:,.1f} MB, "
+                   f"{engine_stats['hit_rate']:.0%} hit rate, {engine_stats['evictions']} evictions")
+        thumbnail_stats = get_thumbnail_cache().stats()
+        st.caption(f"Thumbnails: {thumbnail_stats['images']} images, {thumbnail_stats['bytes'] / 2**20:,.1f} MB "
+                   f"of {thumbnail_stats['max_bytes'] / 2**20:,.0f} MB")
\ No newline at end of file
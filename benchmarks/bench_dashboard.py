@@ -0,0 +1,180 @@
+"""Latency and peak-memory benchmarks for the dashboard compute paths.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dashboard --size 20k              # compare with stored baselines
+    python -m benchmarks.bench_dashboard --size 1m --update      # record new baselines
+
+Every chart's filter+aggregate path is timed on synthetic data (see
+synthetic_data.py) along with the load stages and the preprocessing script.
+The run exits non-zero when a case is slower or uses more peak memory than
+its stored baseline allows, or has no baseline for the size at all. Baselines are machine-specific: record them on
+the machine that runs the comparison.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import pandas as pd
+
+import analytics
+from Data_Preprocessing import clean_retail_export
+from analytics import AnalyticsEngine, FakeStoreData, RetailData
+from cart_engine import build_cart_lines, price_cart_lines
+from cube import build_cube
+from pagination import FramePages
+from row_index import RowIndex, sort_for_index
+from schema import apply_retail_schema
+from synthetic_data import SIZES, generate_fake_store, generate_raw_export, generate_retail_sales
+from time_index import TimeIndex
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Cases faster than this are compared with an absolute allowance instead of a ratio
+TIME_SLACK = 0.002
+MEMORY_SLACK_MB = 1.0
+
+
+def build_cases(rows, export_rows, work_dir):
+    """Return ``[(name, callable)]`` for every benchmarked path on data of ``rows`` rows.
+
+    Chart cases call the analytics views directly, so they measure the
+    computation a cache miss pays; ``memo.hit`` measures a cached lookup.
+    """
+    raw = generate_retail_sales(rows)
+    sales = apply_retail_schema(sort_for_index(raw))
+    retail = RetailData(sales, version="bench")
+    store = retail.index.stores[0]
+    start, end = datetime.date(2022, 3, 1), datetime.date(2023, 3, 1)
+
+    payloads = generate_fake_store(products=2_000, carts=5_000, users=500)
+    products = pd.DataFrame(payloads["products"]).rename(
+        columns={"id": "Product ID", "title": "Product Name", "category": "Category", "price": "Price"})
+    carts = price_cart_lines(build_cart_lines(payloads["carts"]), products)
+    fake_store = FakeStoreData(products, carts, pd.DataFrame(payloads["users"]).rename(columns={"id": "User ID"}), version="bench")
+    user = int(fake_store.users["User ID"].iloc[0])
+
+    engine = AnalyticsEngine()
+    engine.run(analytics.sales_by_product, retail, store_location=store)
+
+    export = os.path.join(work_dir, "export.csv")
+    generate_raw_export(export_rows).to_csv(export, index=False)
+
+    cases = [
+        ("load.schema", lambda: apply_retail_schema(sort_for_index(raw))),
+        ("load.cube", lambda: build_cube(sales)),
+        ("load.row_index", lambda: RowIndex(sales)),
+        ("load.time_index", lambda: TimeIndex(sales)),
+        ("chart.total_sales_revenue", lambda: analytics.total_sales_revenue(retail, store, category_contains="elec")),
+        ("chart.sales_trend", lambda: analytics.sales_trend(retail, start, end)),
+        ("chart.sales_trend_monthly", lambda: analytics.sales_trend(retail, start, end, granularity="M", store_location=store)),
+        ("chart.sales_by_product", lambda: analytics.sales_by_product(retail, store)),
+        ("chart.category_by_location", lambda: analytics.category_by_location(retail, store)),
+        ("chart.marketing_vs_units", lambda: analytics.marketing_vs_units(retail, store)),
+        ("chart.marketing_distribution", lambda: analytics.marketing_distribution(retail, store)),
+        ("chart.sales_by_weekday", lambda: analytics.sales_by_weekday(retail, category="Electronics")),
+        ("chart.data_preview", lambda: FramePages(retail.index.store_rows(store)).page(3, 50)),
+        ("memo.hit", lambda: engine.run(analytics.sales_by_product, retail, store_location=store)),
+        ("fakestore.cart_values", lambda: analytics.cart_values(
+            SimpleNamespace(carts=price_cart_lines(build_cart_lines(payloads["carts"]), products)))),
+        ("fakestore.product_search", lambda: analytics.filter_products(fake_store, search="product 1")),
+        ("fakestore.price_distribution", lambda: analytics.price_distribution(fake_store)),
+        ("fakestore.category_average_price", lambda: analytics.category_average_price(fake_store, min_price=10.0)),
+        ("fakestore.top_products", lambda: analytics.top_products(fake_store, search="product 1")),
+        ("fakestore.filter_carts", lambda: analytics.filter_carts(fake_store, user=user, min_quantity=2)),
+        ("fakestore.cart_quantity_distribution", lambda: analytics.cart_quantity_distribution(fake_store, min_quantity=2)),
+        ("fakestore.filter_users", lambda: analytics.filter_users(fake_store, user=user)),
+        ("fakestore.user_purchase_frequency", lambda: analytics.user_purchase_frequency(fake_store)),
+        ("preprocess.clean_export", lambda: clean_retail_export(export, os.path.join(work_dir, "clean.parquet"))),
+    ]
+    return cases
+
+
+def measure(function, repeats):
+    """Median wall time over ``repeats`` runs, then peak traced memory (MB) of one more run."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(timings), "peak_mb": peak / 1e6}
+
+
+def find_regressions(results, baselines, time_tolerance=1.5, memory_tolerance=1.25):
+    """Return a message for every case exceeding its baseline by more than the tolerances.
+
+    Cases without a baseline are not compared; see ``missing_baselines``.
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        if result["seconds"] > baseline["seconds"] * time_tolerance + TIME_SLACK:
+            regressions.append(f"{name}: {result['seconds'] * 1e3:.2f} ms vs baseline {baseline['seconds'] * 1e3:.2f} ms")
+        if result["peak_mb"] > baseline["peak_mb"] * memory_tolerance + MEMORY_SLACK_MB:
+            regressions.append(f"{name}: peak {result['peak_mb']:.1f} MB vs baseline {baseline['peak_mb']:.1f} MB")
+    return regressions
+
+
+def missing_baselines(results, baselines):
+    """Names of the cases that have no stored baseline to be compared with."""
+    return [name for name in results if name not in baselines]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard compute paths.")
+    parser.add_argument("--size", default="20k", choices=sorted(SIZES), help="Retail_Sales rows to generate")
+    parser.add_argument("--export-rows", type=int, default=200_000, help="rows in the preprocessing benchmark export")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="store these results as the new baselines")
+    parser.add_argument("--time-tolerance", type=float, default=1.5)
+    parser.add_argument("--memory-tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench_dashboard_") as work_dir:
+        results = {name: measure(function, args.repeats)
+                   for name, function in build_cases(SIZES[args.size], args.export_rows, work_dir)}
+    stored = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as f:
+            stored = json.load(f)
+    baselines = stored.get(args.size, {})
+
+    print(f"{'case':<40}{'median ms':>12}{'peak MB':>10}{'baseline ms':>14}")
+    for name, result in results.items():
+        baseline = baselines.get(name, {}).get("seconds")
+        print(f"{name:<40}{result['seconds'] * 1e3:>12.2f}{result['peak_mb']:>10.1f}"
+              f"{baseline * 1e3 if baseline is not None else float('nan'):>14.2f}")
+
+    if args.update:
+        stored[args.size] = results
+        with open(BASELINES, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"Baselines for {args.size} written to {BASELINES}")
+        return 0
+
+    regressions = find_regressions(results, baselines, args.time_tolerance, args.memory_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    missing = missing_baselines(results, baselines)
+    for name in missing:
+        print(f"WARNING {name}: no {args.size} baseline; record one with --update")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
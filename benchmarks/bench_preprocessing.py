@@ -0,0 +1,44 @@
+"""Speedup of the process-pool preprocessing mode over the single-process path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_preprocessing --rows 2000000 --workers 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from Data_Preprocessing import clean_retail_export, clean_retail_exports_parallel
+from synthetic_data import generate_raw_export
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    stats = function(*args, **kwargs)
+    return time.perf_counter() - started, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count()])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = os.path.join(tmp, "export.csv")
+        generate_raw_export(args.rows).to_csv(export, index=False)
+        size_mb = os.path.getsize(export) / 1e6
+        print(f"{args.rows:,} rows ({size_mb:.0f} MB), {os.cpu_count()} cores")
+
+        baseline, stats = timed(clean_retail_export, export, os.path.join(tmp, "single.parquet"))
+        print(f"{'single process':>16}: {baseline:7.2f}s  {stats['rows_written']:,} rows written")
+        for workers in sorted(set(args.workers)):
+            elapsed, stats = timed(clean_retail_exports_parallel, export,
+                                   os.path.join(tmp, f"parallel_{workers}.parquet"), workers=workers)
+            print(f"{f'{workers} workers':>16}: {elapsed:7.2f}s  {stats['rows_written']:,} rows written  "
+                  f"speedup x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
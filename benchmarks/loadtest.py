@@ -0,0 +1,310 @@
+"""Concurrent-session load test of app.py on local stand-in data.
+
+Run from the repository root:
+
+    python -m benchmarks.loadtest --sessions 8 --steps 25
+    python -m benchmarks.loadtest --sessions 20 --p95-budget-ms 1500 --memory-budget-mb 10
+
+Each simulated analyst is a headless Streamlit session (``AppTest``) on
+its own thread, taking a random walk over both dashboards: switching
+dashboard, sidebar views and graph radios, and moving the filter widgets.
+All sessions share the process's caches, as they would on one server.
+``AppTest`` swaps a process-wide runtime while a script runs, so reruns
+take turns; a rerun's latency includes the time it queued behind other
+sessions, which is what a GIL-bound server makes analysts wait too.
+Retail_Sales is served by the embedded DuckDB source from a synthetic
+Parquet file and the Fake Store API by a local HTTP server, so nothing
+leaves the machine. The report gives p50/p95 rerun latency, process memory
+growth per session and cache hit rates; the run exits non-zero when a
+budget is exceeded or a rerun raised.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic_data import SIZES, generate_fake_store, generate_retail_sales
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+DASHBOARDS = ("Retail Dashboard", "Fake Store API Dashboard")
+ACTIONS = ("dashboard", "view", "view", "filter", "filter", "filter")
+
+_run_lock = threading.Lock()
+
+
+def serve_fake_store():
+    """Serve Fake Store endpoints and product images from a local thread.
+
+    Returns the server; fill its ``payloads`` dict (endpoint -> JSON
+    payload) before the app fetches. Every ``/img/`` path returns the same
+    small JPEG.
+    """
+    from PIL import Image
+
+    image = io.BytesIO()
+    Image.new("RGB", (400, 400), "steelblue").save(image, "JPEG")
+    payloads = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            endpoint = self.path.strip("/")
+            if endpoint in payloads:
+                self._send(200, json.dumps(payloads[endpoint]).encode(), "application/json")
+            elif self.path.startswith("/img/"):
+                self._send(200, image.getvalue(), "image/jpeg")
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.payloads = payloads
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def prepare_environment(work_dir, rows, seed=0):
+    """Write the stand-in data, start the API server and point app.py at both through its environment."""
+    parquet = os.path.join(work_dir, "Retail_Sales.parquet")
+    generate_retail_sales(rows, seed=seed).to_parquet(parquet, index=False)
+    server = serve_fake_store()
+    url = f"http://127.0.0.1:{server.server_port}"
+    server.payloads.update(generate_fake_store(products=200, carts=300, users=50, seed=seed,
+                                               image_url=url + "/img/{id}.jpg"))
+    os.environ.update({
+        "RETAIL_SOURCE": "duckdb",
+        "RETAIL_PARQUET": parquet,
+        "RETAIL_SNAPSHOT_DIR": os.path.join(work_dir, "snapshot"),
+        "RETAIL_SHARED_CACHE_DIR": os.path.join(work_dir, "shared_cache"),
+        "RETAIL_THUMBNAIL_DIR": os.path.join(work_dir, "thumbnails"),
+        "RETAIL_DASHBOARD_LOG": os.path.join(work_dir, "telemetry.log"),
+        "FAKE_STORE_URL": url,
+    })
+    return server
+
+
+def rss_mb():
+    """Resident memory of this process in MB (peak RSS where the current value is not available)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, q):
+    """The ``q``-th percentile (0-100) of ``values``, interpolated between the closest ranks."""
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def random_step(at, rng):
+    """Change one widget of session ``at`` the way an analyst would; returns a label, or None if nothing applied."""
+    action = rng.choice(ACTIONS)
+    if action == "dashboard":
+        at.sidebar.selectbox[0].set_value(rng.choice(DASHBOARDS))
+        return "dashboard"
+    if action == "view":
+        radios = list(at.sidebar.radio) + list(at.main.radio)
+        radio = rng.choice(radios)
+        radio.set_value(rng.choice(radio.options))
+        return f"view:{radio.label}"
+    widgets = [w for w in list(at.main.selectbox) + list(at.main.slider) + list(at.main.multiselect) if not w.disabled]
+    if not widgets:
+        return None
+    widget = rng.choice(widgets)
+    if widget.type == "selectbox":
+        if not widget.options:
+            return None
+        widget.select_index(rng.randrange(len(widget.options)))
+    elif widget.type == "multiselect":
+        widget.set_value(rng.sample(list(widget.options), rng.randint(0, min(3, len(widget.options)))))
+    elif isinstance(widget.min, (int, float)) and widget.max > widget.min:
+        values = sorted(rng.uniform(widget.min, widget.max) for _ in range(2))
+        if isinstance(widget.min, int) and isinstance(widget.step, int):
+            values = [widget.min + round((value - widget.min) / widget.step) * widget.step for value in values]
+        widget.set_value(tuple(values) if isinstance(widget.value, tuple) else values[0])
+    else:
+        return None
+    return f"filter:{widget.label}"
+
+
+def run_session(number, steps, seed, timeout, results):
+    """One simulated analyst: an initial load then ``steps`` random widget changes, each a timed rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + number)
+    session = {"latencies": [], "run_ms": [], "errors": [], "skipped": 0}
+    results[number] = session
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    for step in range(steps + 1):
+        label = "load"
+        if step:
+            try:
+                label = random_step(at, rng)
+            except Exception:
+                label = None  # the widget's options did not allow the change; try another
+            if label is None:
+                session["skipped"] += 1
+                continue
+        queued = time.perf_counter()
+        try:
+            with _run_lock:
+                started = time.perf_counter()
+                at.run()
+        except Exception as e:
+            session["errors"].append(f"{label}: {e}")
+            break
+        finished = time.perf_counter()
+        session["latencies"].append((finished - queued) * 1e3)
+        session["run_ms"].append((finished - started) * 1e3)
+        session["errors"].extend(f"{label}: {e.value}" for e in at.exception)
+    session["app"] = at  # kept alive so the memory reading after the run includes every session
+
+
+def analytics_cache_stats(timeout):
+    """Hit rate and size of the shared analytics cache, read from a session's performance panel."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["show_performance"] = True
+    with _run_lock:
+        at.run()
+    for caption in at.sidebar.caption:
+        match = re.search(r"Analytics cache: (\d+) views, ([\d.,]+) MB, (\d+)% hit rate, (\d+) evictions", caption.value)
+        if match:
+            return {"entries": int(match[1]), "mb": float(match[2].replace(",", "")),
+                    "hit_rate": int(match[3]) / 100, "evictions": int(match[4])}
+    return {}
+
+
+def run_load_test(sessions=8, steps=25, rows=SIZES["20k"], seed=0, timeout=120):
+    """Drive ``sessions`` concurrent sessions through app.py and return the report."""
+    import telemetry
+
+    with tempfile.TemporaryDirectory(prefix="loadtest_") as work_dir:
+        server = prepare_environment(work_dir, rows, seed)
+        try:
+            # Warm the server-wide caches so every session measures steady-state reruns
+            warm = {}
+            run_session(-1, 0, seed, timeout, warm)
+            memory_before = rss_mb()
+            results = {}
+            threads = [threading.Thread(target=run_session, args=(number, steps, seed, timeout, results))
+                       for number in range(sessions)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            memory_after = rss_mb()
+            analytics = analytics_cache_stats(timeout)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    latencies = [ms for session in results.values() for ms in session["latencies"]]
+    run_ms = [ms for session in results.values() for ms in session["run_ms"]]
+    datasets = telemetry.cache_totals()
+    lookups = sum(counts["hits"] + counts["misses"] for counts in datasets.values())
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "reruns_per_second": len(latencies) / elapsed if elapsed else float("nan"),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "max_ms": max(latencies, default=float("nan")),
+        "run_p95_ms": percentile(run_ms, 95),
+        "memory_before_mb": memory_before,
+        "memory_after_mb": memory_after,
+        "memory_per_session_mb": (memory_after - memory_before) / sessions if sessions else 0.0,
+        "dataset_hit_rate": sum(counts["hits"] for counts in datasets.values()) / lookups if lookups else 0.0,
+        "analytics_cache": analytics,
+        "skipped_steps": sum(session["skipped"] for session in results.values()),
+        "errors": [error for session in list(warm.values()) + list(results.values()) for error in session["errors"]],
+    }
+
+
+def check_budgets(report, p50_ms=None, p95_ms=None, memory_per_session_mb=None, min_hit_rate=None):
+    """Return a message for every budget the report exceeds (budgets left as None are not checked)."""
+    violations = [f"rerun raised: {error}" for error in report["errors"]]
+    if p50_ms is not None and report["p50_ms"] > p50_ms:
+        violations.append(f"p50 rerun {report['p50_ms']:.0f} ms exceeds budget {p50_ms:.0f} ms")
+    if p95_ms is not None and report["p95_ms"] > p95_ms:
+        violations.append(f"p95 rerun {report['p95_ms']:.0f} ms exceeds budget {p95_ms:.0f} ms")
+    if memory_per_session_mb is not None and report["memory_per_session_mb"] > memory_per_session_mb:
+        violations.append(f"memory growth {report['memory_per_session_mb']:.1f} MB/session "
+                          f"exceeds budget {memory_per_session_mb:.1f} MB")
+    hit_rate = report["analytics_cache"].get("hit_rate")
+    if min_hit_rate is not None and hit_rate is not None and hit_rate < min_hit_rate:
+        violations.append(f"analytics cache hit rate {hit_rate:.0%} below budget {min_hit_rate:.0%}")
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent headless sessions.")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated analysts")
+    parser.add_argument("--steps", type=int, default=25, help="widget changes per session")
+    parser.add_argument("--size", default="20k", choices=sorted(SIZES), help="Retail_Sales rows to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds a single rerun may take")
+    parser.add_argument("--p50-budget-ms", type=float, default=500)
+    parser.add_argument("--p95-budget-ms", type=float, default=2000)
+    parser.add_argument("--memory-budget-mb", type=float, default=25, help="process memory growth per session")
+    parser.add_argument("--min-hit-rate", type=float, default=None, help="analytics cache hit rate, 0-1")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.sessions, args.steps, SIZES[args.size], args.seed, args.timeout)
+    print(f"{report['sessions']} sessions, {report['reruns']} reruns ({report['reruns_per_second']:.1f}/s), "
+          f"{report['skipped_steps']} steps skipped")
+    print(f"rerun latency   p50 {report['p50_ms']:.0f} ms   p95 {report['p95_ms']:.0f} ms   max {report['max_ms']:.0f} ms"
+          f"   (p95 {report['run_p95_ms']:.0f} ms excluding queueing)")
+    print(f"memory          {report['memory_before_mb']:.0f} MB -> {report['memory_after_mb']:.0f} MB "
+          f"({report['memory_per_session_mb']:.1f} MB/session)")
+    print(f"dataset cache   {report['dataset_hit_rate']:.0%} hits")
+    if report["analytics_cache"]:
+        cache = report["analytics_cache"]
+        print(f"analytics cache {cache['hit_rate']:.0%} hits, {cache['entries']} views, {cache['mb']:.1f} MB, "
+              f"{cache['evictions']} evictions")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    violations = check_budgets(report, args.p50_budget_ms, args.p95_budget_ms, args.memory_budget_mb, args.min_hit_rate)
+    for message in violations:
+        print(f"OVER BUDGET {message}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
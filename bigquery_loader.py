@@ -0,0 +1,68 @@
+import db_dtypes
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from google.cloud import bigquery
+
+RETAIL_TABLE = "`symbolic-surf-454106-v9.Retail_Data.Retail_Sales`"
+
+# Columns the dashboards read; anything else in Retail_Sales is never downloaded
+RETAIL_COLUMNS = ("product_id", "store_location", "category", "date", "day_of_the_week",
+                  "sales_revenue", "marketing_spend", "units_sold")
+
+# Low-cardinality strings, dictionary-encoded as batches arrive so they load as categoricals
+DICTIONARY_COLUMNS = ("store_location", "category", "day_of_the_week")
+
+
+def build_incremental_query(table, columns=RETAIL_COLUMNS, watermark_column="date", watermark=None):
+    """SELECT of ``columns`` only, restricted to rows past ``watermark`` when one is given."""
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    params = {}
+    if watermark is not None:
+        sql += f" WHERE {watermark_column} > @watermark"
+        params["watermark"] = watermark
+    return sql, params
+
+
+def stream_record_batches(client, sql, params=None, bqstorage_client=None, page_size=None):
+    """Run a query and yield its result as Arrow record batches.
+
+    With a ``bqstorage_client`` the rows come from the BigQuery Storage Read
+    API as Arrow streams; without one, each REST page is converted to a
+    batch. Either way only one batch is held at a time.
+    """
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter(name, "DATE", value) for name, value in (params or {}).items()
+    ])
+    rows = client.query(sql, job_config=job_config).result(page_size=page_size)
+    return rows.to_arrow_iterable(bqstorage_client=bqstorage_client)
+
+
+def _encode_batch(batch, dictionary_columns):
+    columns = [pc.dictionary_encode(column) if name in dictionary_columns and pa.types.is_string(column.type) else column
+               for name, column in zip(batch.schema.names, batch.columns)]
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def frame_from_batches(batches, columns=RETAIL_COLUMNS, dictionary_columns=DICTIONARY_COLUMNS):
+    """Assemble streamed batches into a DataFrame straight from the Arrow buffers.
+
+    Dictionary columns become categoricals and DATE columns the ``dbdate``
+    dtype that ``to_dataframe`` would produce. Only the unified table keeps
+    the batches' buffers once it is built, and it frees each column as it is
+    converted; peak memory is still the Arrow data plus the columns converted
+    so far, so a column may briefly exist in both forms.
+    """
+    encoded = [_encode_batch(batch, dictionary_columns) for batch in batches]
+    if not encoded:
+        return pd.DataFrame(columns=list(columns))
+    table = pa.Table.from_batches(encoded).unify_dictionaries()
+    del encoded  # otherwise the batches keep every buffer alive through self_destruct
+    return table.to_pandas(split_blocks=True, self_destruct=True,
+                           types_mapper={pa.date32(): db_dtypes.DateDtype()}.get)
+
+
+def load_retail_since(client, table, watermark=None, columns=RETAIL_COLUMNS, bqstorage_client=None):
+    """Retail_Sales rows newer than ``watermark`` (all rows when None), projected to ``columns``."""
+    sql, params = build_incremental_query(table, columns, watermark=watermark)
+    return frame_from_batches(stream_record_batches(client, sql, params, bqstorage_client), columns)
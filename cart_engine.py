@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+
+def build_cart_lines(carts):
+    """One row per (cart, product) from the raw ``/carts`` payload, built column by column."""
+    items = [cart.get("products") or [] for cart in carts]
+    lengths = np.fromiter((len(products) for products in items), dtype=np.int64, count=len(items))
+    lines = [line for products in items for line in products]
+    return pd.DataFrame({
+        "Cart ID": np.repeat([cart["id"] for cart in carts], lengths).astype(np.int64),
+        "User ID": np.repeat([cart["userId"] for cart in carts], lengths).astype(np.int64),
+        "Date": pd.to_datetime([cart.get("date") for cart in carts], utc=True).repeat(lengths),
+        "Product ID": np.fromiter((line["productId"] for line in lines), dtype=np.int64, count=len(lines)),
+        "Quantity": np.fromiter((line["quantity"] for line in lines), dtype=np.int64, count=len(lines)),
+    })
+
+
+def price_cart_lines(cart_lines, products):
+    """Hash-join cart lines to the product catalog on Product ID and add line totals.
+
+    Lines whose product is missing from the catalog get a NaN price, so they
+    drop out of the totals instead of being counted at zero.
+    """
+    catalog = products.drop_duplicates("Product ID", keep="last")
+    positions = pd.Index(catalog["Product ID"]).get_indexer(cart_lines["Product ID"])
+    found = positions >= 0
+    prices = np.where(found, catalog["Price"].to_numpy(dtype=np.float64)[positions], np.nan)
+    names = np.where(found, catalog["Product Name"].to_numpy(dtype=object)[positions], None)
+    return cart_lines.assign(**{
+        "Product Name": names,
+        "Product Price": prices,
+        "Line Total": cart_lines["Quantity"].to_numpy() * prices,
+    })
+
+
+def cart_totals(priced_lines):
+    """Value and item count of every cart, keyed by cart and user."""
+    return (priced_lines.groupby(["Cart ID", "User ID"], sort=True)
+            .agg(**{"Items": ("Quantity", "sum"), "Cart Value": ("Line Total", "sum")})
+            .reset_index())
@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def sales_rows():
+    """Small Retail_Sales-shaped frame shared by the query, cube and index tests."""
+    return pd.DataFrame({
+        "product_id": [1, 2, 1, 3, 2],
+        "store_location": ["Austin", "Austin", "Boston", "Austin", "Boston"],
+        "category": ["Electronics", "Clothing", "Electronics", "Electronics", "Clothing"],
+        "date": ["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-03"],
+        "day_of_the_week": ["Monday", "Monday", "Tuesday", "Wednesday", "Wednesday"],
+        "sales_revenue": [100.0, 50.0, 70.0, 30.0, 20.0],
+        "marketing_spend": [10.0, 5.0, 7.0, 3.0, 2.0],
+        "units_sold": [4, 2, 3, 1, 1],
+    })
+
+class StubServer:
+    """Local HTTP server standing in for the Fake Store API.
+
+    ``routes`` maps a path to ``(body, content_type)``; ``failures`` maps a
+    path to a number of 503 responses to send first; ``delay`` is added to
+    every response.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.failures = {}
+        self.delay = 0.0
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                time.sleep(stub.delay)
+                if stub.failures.get(self.path, 0) > 0:
+                    stub.failures[self.path] -= 1
+                    return self._send(503, b"unavailable", "text/plain")
+                if self.path not in stub.routes:
+                    return self._send(404, b"not found", "text/plain")
+                self._send(200, *stub.routes[self.path])
+
+            def _send(self, status, body, content_type):
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (e.g. on a timeout)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def add_json(self, path, payload):
+        self.routes[path] = (json.dumps(payload).encode(), "application/json")
+
+@pytest.fixture
+def stub_server():
+    stub = StubServer()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,85 @@
+import pandas as pd
+
+MEASURES = ("sales_revenue", "marketing_spend", "units_sold")
+CATEGORICAL_DIMENSIONS = ("store_location", "category", "day_of_the_week")
+
+# Group-bys materialized per data load, one for each dashboard view; trends are
+# served by the time index instead. Lookups pick the smallest rollup that
+# covers the requested grouping and filters.
+DEFAULT_ROLLUPS = (
+    ("store_location", "category"),
+    ("store_location", "product_id"),
+    ("category", "day_of_the_week"),
+)
+
+# Dimension each dashboard filter needs in a rollup
+FILTER_DIMENSIONS = {
+    "store_location": "store_location",
+    "category": "category",
+    "category_contains": "category",
+}
+
+
+def build_cube(frame, rollups=DEFAULT_ROLLUPS):
+    """Materialize the measure sums of ``frame`` for each rollup."""
+    frame = frame.copy(deep=False)
+    for column in CATEGORICAL_DIMENSIONS:
+        if column in frame:
+            frame[column] = frame[column].astype("category")
+
+    measures = [column for column in MEASURES if column in frame]
+    for column in measures:
+        # Sum float32 measures in double precision
+        if pd.api.types.is_float_dtype(frame[column]):
+            frame[column] = frame[column].astype("float64")
+    materialized = {}
+    for dims in rollups:
+        rollup = frame.groupby(list(dims), observed=True, sort=True)[measures].sum().reset_index()
+        materialized[tuple(dims)] = rollup
+    return AggregateCube(materialized, len(frame))
+
+
+class AggregateCube:
+    """Precomputed sums of the retail measures over a fixed set of rollups.
+
+    ``query`` returns the ``group_by`` columns followed by the summed
+    ``measures``.
+    """
+
+    def __init__(self, rollups, source_rows):
+        self.rollups = rollups
+        self.source_rows = source_rows
+
+    @property
+    def nbytes(self):
+        return sum(int(rollup.memory_usage(deep=True).sum()) for rollup in self.rollups.values())
+
+    def query(self, measures, group_by=(), **filters):
+        filters = {name: value for name, value in filters.items() if value is not None and value != ""}
+        rollup = self._select_rollup(set(group_by) | {FILTER_DIMENSIONS[name] for name in filters})
+        rollup = rollup[self._mask(rollup, filters)]
+        if not group_by:
+            return pd.DataFrame([rollup[list(measures)].sum()])
+        result = rollup.groupby(list(group_by), observed=True, sort=True)[list(measures)].sum().reset_index()
+        for column in group_by:
+            if isinstance(result[column].dtype, pd.CategoricalDtype):
+                result[column] = result[column].astype(result[column].cat.categories.dtype)
+        return result
+
+    def _select_rollup(self, dims):
+        candidates = [rollup for key, rollup in self.rollups.items() if dims <= set(key)]
+        if not candidates:
+            raise KeyError(f"No rollup covers dimensions {sorted(dims)}")
+        return min(candidates, key=len)
+
+    def _mask(self, rollup, filters):
+        mask = pd.Series(True, index=rollup.index)
+        for name, value in filters.items():
+            if name == "category_contains":
+                # Match against the distinct categories, not every row
+                categories = rollup["category"].cat.categories
+                matches = categories[categories.str.lower().str.contains(value, regex=False)]
+                mask &= rollup["category"].isin(matches)
+            else:
+                mask &= rollup[FILTER_DIMENSIONS[name]] == value
+        return mask
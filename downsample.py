@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# Upper bound on marks sent to the browser per chart
+MAX_POINTS = 2_000
+
+
+def _numeric(values):
+    """Float view of a column; datetimes become nanoseconds since the epoch."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("int64").to_numpy(dtype=np.float64)
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _sorted_by(frame, x):
+    return frame if frame[x].is_monotonic_increasing else frame.sort_values(x, kind="stable")
+
+
+def lttb(frame, x, y, max_points=MAX_POINTS):
+    """Largest-Triangle-Three-Buckets: ``max_points`` rows of ``frame`` that keep the shape of ``y`` over ``x``.
+
+    The first and last rows are always kept; every bucket in between
+    contributes the row forming the largest triangle with the previously
+    kept row and the mean of the next bucket. Frames within the limit are
+    returned unchanged.
+    """
+    frame = _sorted_by(frame, x)
+    n = len(frame)
+    if n <= max_points or max_points < 3:
+        return frame
+    xs, ys = _numeric(frame[x]), _numeric(frame[y])
+    edges = np.floor(np.arange(max_points - 1) * (n - 2) / (max_points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = xs[stop:edges[i + 2]].mean(), ys[stop:edges[i + 2]].mean()
+        else:
+            next_x, next_y = xs[-1], ys[-1]
+        ax, ay = xs[previous], ys[previous]
+        areas = np.abs((ax - next_x) * (ys[start:stop] - ay) - (ax - xs[start:stop]) * (next_y - ay))
+        previous = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        keep[i + 1] = previous
+    return frame.iloc[keep]
+
+
+def minmax(frame, x, y, max_points=MAX_POINTS):
+    """Keep the first and last rows plus the minimum and maximum ``y`` of each bucket, at most ``max_points`` rows.
+
+    Cheaper than ``lttb`` and keeps every spike, at the cost of a noisier
+    line. Frames within the limit are returned unchanged.
+    """
+    frame = _sorted_by(frame, x)
+    n = len(frame)
+    if n <= max_points:
+        return frame
+    if max_points < 4:
+        return lttb(frame, x, y, max_points)
+    ys = _numeric(frame[y])
+    count = (max_points - 2) // 2
+    buckets = np.arange(n) * count // n
+    order = np.lexsort((ys, buckets))
+    starts = np.searchsorted(buckets, np.arange(count))
+    ends = np.append(starts[1:], n)
+    keep = np.unique(np.concatenate([order[starts], order[ends - 1], [0, n - 1]]))
+    return frame.iloc[keep]
+
+
+def bin_2d(frame, x, y, bins=40):
+    """Counts of ``frame`` rows on a ``bins`` x ``bins`` grid over ``x`` and ``y``.
+
+    Returns one row per non-empty cell with ``{x}_start``, ``{x}_end``,
+    ``{y}_start``, ``{y}_end`` and ``count``, ready for a ``mark_rect``
+    heatmap with ``bin="binned"`` axes.
+    """
+    xs, ys = _numeric(frame[x]), _numeric(frame[y])
+    present = np.isfinite(xs) & np.isfinite(ys)
+    counts, x_edges, y_edges = np.histogram2d(xs[present], ys[present], bins=bins)
+    xi, yi = np.nonzero(counts)
+    return pd.DataFrame({
+        f"{x}_start": x_edges[xi],
+        f"{x}_end": x_edges[xi + 1],
+        f"{y}_start": y_edges[yi],
+        f"{y}_end": y_edges[yi + 1],
+        "count": counts[xi, yi].astype(np.int64),
+    })
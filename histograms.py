@@ -0,0 +1,21 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+
+
+def histogram_bins(values, bins=20):
+    """Bin edges and counts of ``values`` (missing values ignored) as ``bin_start``, ``bin_end``, ``count``."""
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+
+def histogram_chart(binned, title, color="skyblue"):
+    """Bar chart of ``histogram_bins`` output; only the bin counts reach the browser."""
+    return alt.Chart(binned).mark_bar(color=color, stroke="black").encode(
+        x=alt.X("bin_start:Q", bin="binned", title=title),
+        x2="bin_end:Q",
+        y=alt.Y("count:Q", title="Frequency"),
+        tooltip=["bin_start", "bin_end", "count"]
+    ).properties(width=700, height=300)
+
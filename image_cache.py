@@ -0,0 +1,168 @@
+import functools
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image
+
+THUMBNAIL_SIZE = 150
+MAX_CACHE_BYTES = 64 * 2**20
+# Seconds before an image that could not be fetched is tried again
+RETRY_AFTER = 5 * 60
+
+
+class ThumbnailCache:
+    """Product image thumbnails kept on local disk, bounded by size and evicted least recently used.
+
+    Images are downloaded once, shrunk to fit ``size`` x ``size`` pixels
+    and stored as JPEG files named by a hash of their URL. ``st.image`` can
+    serve those files itself, so rendering a cached image makes no request
+    to the image host. Reads refresh a file's modification time, which is
+    the recency used for eviction. Files are written atomically, so several
+    processes may share ``directory``.
+
+    Downloads use short timeouts and, with the default session, no retries.
+    A URL that fails is not tried again for ``retry_after`` seconds, so a
+    dead or slow image host costs one attempt per image, not one per rerun.
+    """
+
+    def __init__(self, directory, session=None, max_bytes=MAX_CACHE_BYTES, size=THUMBNAIL_SIZE,
+                 timeout=(1, 3), workers=8, retry_after=RETRY_AFTER):
+        self.directory = directory
+        self.session = session or requests.Session()
+        self.max_bytes = max_bytes
+        self.size = size
+        self.timeout = timeout
+        self.workers = workers
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._failed = {}
+        self._pending = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + ".jpg")
+
+    def get(self, url):
+        """Path of the cached thumbnail of ``url``, or None when it is not cached."""
+        path = self.path(url)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def cached(self, urls):
+        """``{url: path or None}`` for ``urls`` from the cache alone, without downloading anything."""
+        return {url: self.get(url) for url in dict.fromkeys(urls) if url}
+
+    def fetch(self, url):
+        """Download ``url`` and cache its thumbnail; returns the path, or None if it could not be fetched.
+
+        A URL that failed less than ``retry_after`` seconds ago is not requested again.
+        """
+        with self._lock:
+            if self._failed.get(url, 0) > time.monotonic():
+                return None
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            thumbnail = make_thumbnail(response.content, self.size)
+        except (requests.RequestException, OSError, Image.DecompressionBombError) as e:
+            logging.warning(f"Could not fetch product image {url}: {e}")
+            with self._lock:
+                self._failed[url] = time.monotonic() + self.retry_after
+            return None
+        with self._lock:
+            self._failed.pop(url, None)
+        path = self.path(url)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(thumbnail)
+        os.replace(tmp, path)
+        self._evict()
+        return self.get(url)
+
+    def thumbnails(self, urls):
+        """``{url: path or None}`` for ``urls``, downloading the uncached ones concurrently."""
+        paths = self.cached(urls)
+        missing = [url for url, path in paths.items() if path is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                paths.update(zip(missing, pool.map(self.fetch, missing)))
+        return paths
+
+    def prefetch_in_background(self, urls):
+        """Cache thumbnails for ``urls`` on a daemon thread; returns the thread.
+
+        URLs already being fetched by an earlier prefetch are left to it.
+        """
+        with self._lock:
+            urls = [url for url in dict.fromkeys(urls) if url and url not in self._pending]
+            self._pending.update(urls)
+
+        def run():
+            try:
+                self.thumbnails(urls)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(urls)
+
+        thread = threading.Thread(target=run, name="thumbnail-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".jpg"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def stats(self):
+        sizes = [entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".jpg")]
+        return {"images": len(sizes), "bytes": sum(sizes), "max_bytes": self.max_bytes}
+
+
+@functools.lru_cache(maxsize=4)
+def placeholder_image(size=THUMBNAIL_SIZE):
+    """JPEG bytes of a plain grey square shown while a thumbnail is not cached."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (235, 235, 235)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def make_thumbnail(content, size=THUMBNAIL_SIZE):
+    """JPEG bytes of the image in ``content`` shrunk to fit ``size`` x ``size``, keeping its aspect ratio."""
+    with Image.open(io.BytesIO(content)) as image:
+        # Lets the JPEG decoder skip straight to a reduced scale instead of decoding every pixel
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size))
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85, optimize=True)
+        return buffer.getvalue()
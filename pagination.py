@@ -0,0 +1,21 @@
+def page_count(total_rows, rows_per_page):
+    """Number of pages needed for ``total_rows``; an empty result still has one page."""
+    return max(1, -(-total_rows // rows_per_page))
+
+
+class FramePages:
+    """Pages sliced from an already-filtered frame; only the requested page is materialized.
+
+    Filtered frames come from the row and substring indexes as slices or
+    cached selections, so paging costs the same for any filter size.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def count(self):
+        return len(self.frame)
+
+    def page(self, number, rows_per_page):
+        start = (number - 1) * rows_per_page
+        return self.frame.iloc[start:start + rows_per_page]
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+# One loaded value of a source; replaced as a whole so readers never see a half-updated source
+Version = namedtuple("Version", ["value", "number", "loaded_at"])
+
+
+class _Source:
+    def __init__(self, name, loader, max_age):
+        self.name = name
+        self.loader = loader
+        self.max_age = max_age
+        self.current = None
+        self.refreshing = False
+        self.last_error = None
+        self.failures = 0
+        self.retry_at = 0
+        self.ready = threading.Event()
+
+
+class RefreshScheduler:
+    """Stale-while-revalidate loader for the dashboard's data sources.
+
+    ``loader(current)`` builds a new value for a source; it receives the
+    value being served (``None`` on the first load) and may return that same
+    object when nothing changed. Reads always return the current version
+    immediately; a stale source is reloaded on a background thread and the
+    new version is swapped in when it is complete. A failed reload is logged
+    and the last good version keeps being served; the source is retried
+    after ``retry_after`` seconds. Only a source that has never loaded makes
+    readers wait.
+    """
+
+    def __init__(self, max_age=15 * 60, retry_after=60, clock=time.monotonic):
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.clock = clock
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def register(self, name, loader, max_age=None):
+        self._sources[name] = _Source(name, loader, self.max_age if max_age is None else max_age)
+
+    def preload(self, wait=False):
+        """Start loading every source in the background; with ``wait``, block until all have tried once."""
+        threads = [thread for thread in map(self._refresh_in_background, self._sources) if thread is not None]
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def is_ready(self, name):
+        return self._sources[name].current is not None
+
+    def is_stale(self, name):
+        current = self._sources[name].current
+        return current is None or self.clock() - current.loaded_at > self._sources[name].max_age
+
+    def _due(self, name):
+        return self.is_stale(name) and self.clock() >= self._sources[name].retry_at
+
+    def get(self, name, timeout=None):
+        """The current value of ``name``, starting a background reload when it is stale.
+
+        Waits for the first load if there is no value yet and raises the
+        load's error (or ``TimeoutError``) if it still has none.
+        """
+        source = self._sources[name]
+        if self._due(name):
+            self._refresh_in_background(name)
+        if source.current is None:
+            source.ready.wait(timeout)
+            if source.current is None:
+                raise source.last_error or TimeoutError(f"{name} is still loading")
+        return source.current.value
+
+    def version(self, name):
+        return self._sources[name].current
+
+    def last_error(self, name):
+        """The error of the latest reload of ``name``, or None if it succeeded."""
+        return self._sources[name].last_error
+
+    def refresh(self, name):
+        """Reload ``name`` on this thread; returns True when a new version was swapped in."""
+        source = self._sources[name]
+        current = source.current
+        try:
+            value = source.loader(current.value if current else None)
+            source.last_error = None
+            if current is not None and value is current.value:
+                source.current = current._replace(loaded_at=self.clock())
+                return False
+            source.current = Version(value, current.number + 1 if current else 1, self.clock())
+            logging.info(f"{name} refreshed to version {source.current.number}")
+            return True
+        except Exception as e:
+            logging.error(f"Refreshing {name} failed; serving the last good version: {e}")
+            source.last_error = e
+            source.failures += 1
+            source.retry_at = self.clock() + self.retry_after
+            return False
+        finally:
+            with self._lock:
+                source.refreshing = False
+            source.ready.set()
+
+    def _refresh_in_background(self, name):
+        source = self._sources[name]
+        with self._lock:
+            if source.refreshing:
+                return None
+            source.refreshing = True
+        thread = threading.Thread(target=self.refresh, args=(name,), name=f"refresh-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def start(self, poll=60):
+        """Reload stale sources every ``poll`` seconds on a daemon thread, even without readers."""
+        def run():
+            while not self._stop.wait(poll):
+                for name in self._sources:
+                    if self._due(name):
+                        self._refresh_in_background(name)
+        threading.Thread(target=run, name="refresh-scheduler", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        """One row per source for the performance panel."""
+        now = self.clock()
+        return [{"Source": source.name,
+                 "Version": source.current.number if source.current else None,
+                 "Age (s)": round(now - source.current.loaded_at, 1) if source.current else None,
+                 "Refreshing": source.refreshing,
+                 "Failures": source.failures,
+                 "Last Error": str(source.last_error) if source.last_error else ""} for source in self._sources.values()]
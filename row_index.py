@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+SORT_COLUMNS = ["store_location", "category"]
+
+
+def sort_for_index(frame):
+    """Order rows by store, then category, so both form contiguous runs."""
+    if frame.empty or not set(SORT_COLUMNS) <= set(frame.columns):
+        return frame
+    return frame.sort_values(SORT_COLUMNS, kind="stable", ignore_index=True)
+
+
+class RowIndex:
+    """Offset tables over a frame sorted with ``sort_for_index``.
+
+    Every store maps to one ``[start, stop)`` row range and every
+    (store, category) pair to a sub-range of it, so filtering by store is a
+    slice and costs nothing per row.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.store_ranges = _runs(frame["store_location"])
+        self.pair_ranges = _runs(frame["store_location"], frame["category"])
+
+    @property
+    def stores(self):
+        return list(self.store_ranges)
+
+    @property
+    def categories(self):
+        return sorted({category for _, category in self.pair_ranges})
+
+    def store_rows(self, store):
+        start, stop = self.store_ranges.get(store, (0, 0))
+        return self.frame.iloc[start:stop]
+
+
+def _runs(*columns):
+    # Map each run of equal keys to its [start, stop) offsets
+    if len(columns[0]) == 0:
+        return {}
+    change = np.zeros(len(columns[0]), dtype=bool)
+    change[0] = True
+    for column in columns:
+        codes = pd.factorize(column, use_na_sentinel=False)[0]
+        change[1:] |= codes[1:] != codes[:-1]
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], len(change))
+    keys = zip(*(column.to_numpy()[starts] for column in columns))
+    runs = {key if len(columns) > 1 else key[0]: (int(start), int(stop))
+            for key, start, stop in zip(keys, starts, stops)}
+    if len(runs) != len(starts):
+        raise ValueError("RowIndex needs a frame sorted by store_location and category (see sort_for_index)")
+    return runs
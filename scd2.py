@@ -0,0 +1,169 @@
+import argparse
+import datetime
+import json
+import logging
+import sqlite3
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from Data_Preprocessing import row_hashes
+
+# A type 2 dimension: ``keys`` identify the business entity, a change in any
+# ``tracked`` column closes the current version and opens a new one
+Dimension = namedtuple("Dimension", ["table", "surrogate_key", "keys", "tracked"])
+
+# Fake Store catalog; price and naming changes are kept as history
+PRODUCT_DIMENSION = Dimension("dim_product", "product_key", ("product_id",), ("product_name", "category", "price"))
+
+# Retail_Sales only carries the location, so stores are inserted once and never versioned
+STORE_DIMENSION = Dimension("dim_store", "store_key", ("store_location",), ())
+
+ROW_HASH = "row_hash"
+VALID_FROM = "valid_from"
+VALID_TO = "valid_to"
+IS_CURRENT = "is_current"
+
+# valid_to of current versions, so "as of" lookups need no NULL handling
+OPEN_END = "9999-12-31"
+
+BATCH_SIZE = 10_000
+
+
+def product_source(products):
+    """Product dimension rows from a Fake Store ``/products`` payload."""
+    frame = pd.DataFrame(products, columns=["id", "title", "category", "price"])
+    return frame.rename(columns={"id": "product_id", "title": "product_name"})
+
+
+def store_source(retail):
+    """Store dimension rows from a Retail_Sales frame."""
+    return pd.DataFrame({"store_location": pd.unique(retail["store_location"].astype(str))})
+
+
+def hash_diff(frame, columns):
+    """Signed 64-bit hash of the ``columns`` of each row, the width SQL INTEGER columns hold."""
+    if not columns:
+        return np.zeros(len(frame), dtype=np.int64)
+    return row_hashes(frame[list(columns)]).view(np.int64)
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def create_dimension_table(conn, dimension, sample):
+    """Create the dimension table (typed from ``sample``) and its current-row lookup index if missing."""
+    columns = [f"{column} {_sql_type(sample[column].dtype)}" for column in dimension.keys + dimension.tracked]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {dimension.table} ("
+                 f"{dimension.surrogate_key} INTEGER PRIMARY KEY, {', '.join(columns)}, "
+                 f"{ROW_HASH} INTEGER NOT NULL, {VALID_FROM} TEXT NOT NULL, {VALID_TO} TEXT NOT NULL, "
+                 f"{IS_CURRENT} INTEGER NOT NULL)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {dimension.table}_current "
+                 f"ON {dimension.table} ({', '.join(dimension.keys)}, {IS_CURRENT})")
+
+
+def _rows(frame):
+    # Python scalars with None for missing values, as DB-API drivers expect
+    return frame.astype(object).where(frame.notna(), None).values.tolist()
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def plan_changes(current, incoming, dimension):
+    """Compare ``incoming`` rows with the ``current`` versions by key and hash.
+
+    ``current`` holds the surrogate key, business keys and row hash of each
+    current version; ``incoming`` the business keys, tracked columns and
+    row hash. Returns ``(inserts, closes, unchanged)``: the incoming rows
+    that are new or changed, the surrogate keys of the versions they
+    replace, and the number of rows left untouched.
+    """
+    keys = list(dimension.keys)
+    merged = incoming.merge(current, on=keys, how="left", suffixes=("", "_current"), indicator=True)
+    existing = (merged["_merge"] == "both").to_numpy()
+    changed = existing & (merged[ROW_HASH].to_numpy() != merged[f"{ROW_HASH}_current"].to_numpy())
+    write = ~existing | changed
+    inserts = merged.loc[write, keys + list(dimension.tracked) + [ROW_HASH]]
+    closes = merged.loc[changed, dimension.surrogate_key].astype(np.int64).tolist()
+    return inserts, closes, int((~write).sum())
+
+
+def merge_dimension(conn, dimension, source, as_of=None, batch_size=BATCH_SIZE):
+    """Apply one load of ``source`` to a type 2 dimension table.
+
+    Rows are compared with the current versions by a hash of the tracked
+    columns, so only new and changed keys are written: changed versions are
+    closed with ``valid_to = as_of`` and every new version is inserted as
+    current from ``as_of``, both with ``executemany`` in ``batch_size``
+    batches inside one transaction. Keys missing from ``source`` are left
+    open, so partial daily extracts are safe. Returns row counts for logging.
+    """
+    as_of = (as_of or datetime.date.today()).isoformat()
+    incoming = source[list(dimension.keys + dimension.tracked)].drop_duplicates(list(dimension.keys), keep="last")
+    incoming = incoming.assign(**{ROW_HASH: hash_diff(incoming, dimension.tracked)})
+    create_dimension_table(conn, dimension, incoming)
+    current = pd.read_sql_query(
+        f"SELECT {dimension.surrogate_key}, {', '.join(dimension.keys)}, {ROW_HASH} "
+        f"FROM {dimension.table} WHERE {IS_CURRENT} = 1", conn)
+    # Keys come back with the column's storage type; align them with the source for the join
+    current = current.astype({key: incoming[key].dtype for key in dimension.keys})
+    inserts, closes, unchanged = plan_changes(current, incoming, dimension)
+
+    columns = list(dimension.keys + dimension.tracked) + [ROW_HASH, VALID_FROM, VALID_TO, IS_CURRENT]
+    insert_sql = f"INSERT INTO {dimension.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    close_sql = (f"UPDATE {dimension.table} SET {VALID_TO} = ?, {IS_CURRENT} = 0 "
+                 f"WHERE {dimension.surrogate_key} = ?")
+    with conn:
+        for batch in _batches(closes, batch_size):
+            conn.executemany(close_sql, [(as_of, key) for key in batch])
+        rows = _rows(inserts.assign(**{VALID_FROM: as_of, VALID_TO: OPEN_END, IS_CURRENT: 1}))
+        for batch in _batches(rows, batch_size):
+            conn.executemany(insert_sql, batch)
+    stats = {"inserted": len(inserts) - len(closes), "updated": len(closes), "unchanged": unchanged}
+    logging.info(f"Merged {len(incoming)} rows into {dimension.table} as of {as_of}: {stats}")
+    return stats
+
+
+def dimension_as_of(conn, dimension, as_of):
+    """The version of every key that was current on ``as_of``."""
+    return pd.read_sql_query(
+        f"SELECT * FROM {dimension.table} WHERE {VALID_FROM} <= ? AND ? < {VALID_TO} "
+        f"ORDER BY {', '.join(dimension.keys)}", conn, params=(as_of.isoformat(), as_of.isoformat()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the product and store dimensions as SCD type 2 tables.")
+    parser.add_argument("database", help="SQLite database holding the dimension tables")
+    parser.add_argument("--products", help="saved Fake Store /products JSON response")
+    parser.add_argument("--retail", help="cleaned Retail_Sales export (.parquet or .csv)")
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="load date, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    conn = sqlite3.connect(args.database)
+    try:
+        if args.products:
+            with open(args.products) as f:
+                merge_dimension(conn, PRODUCT_DIMENSION, product_source(json.load(f)), args.as_of)
+        if args.retail:
+            if args.retail.lower().endswith(".csv"):
+                retail = pd.read_csv(args.retail, usecols=["store_location"])
+            else:
+                retail = pd.read_parquet(args.retail, columns=["store_location"])
+            merge_dimension(conn, STORE_DIMENSION, store_source(retail), args.as_of)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+CATEGORICAL_COLUMNS = ("store_location", "category", "day_of_the_week")
+DATE_COLUMNS = ("date",)
+
+
+def apply_retail_schema(frame):
+    """Return a compact, read-only copy of a Retail_Sales frame.
+
+    Low-cardinality strings become categoricals (weekdays in calendar order),
+    dates are parsed once, integers are downcast and floats are stored as
+    float32 where that is lossless. Every column is backed by a read-only
+    buffer, so in-place writes raise instead of corrupting a frame shared
+    between sessions; derive new frames instead.
+    """
+    columns = {name: _convert(name, frame[name]) for name in frame.columns}
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(frame)), copy=False)
+
+
+def _convert(name, series):
+    if name in CATEGORICAL_COLUMNS:
+        if name == "day_of_the_week" and series.dropna().isin(WEEKDAYS).all():
+            dtype = pd.CategoricalDtype(WEEKDAYS, ordered=True)
+        else:
+            dtype = pd.CategoricalDtype(sorted(series.dropna().unique()))
+        codes = pd.Categorical(series, dtype=dtype).codes
+        return pd.Categorical.from_codes(_read_only(codes), dtype=dtype)
+    if name in DATE_COLUMNS:
+        return _read_only(pd.to_datetime(series).to_numpy())
+    if series.isna().any():
+        # Nullable columns keep their pandas dtype (and stay writable)
+        return series.array.copy()
+    if pd.api.types.is_bool_dtype(series):
+        return _read_only(series.to_numpy(dtype="bool"))
+    if pd.api.types.is_integer_dtype(series):
+        return _read_only(pd.to_numeric(series.to_numpy(dtype="int64"), downcast="integer"))
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype="float64")
+        narrowed = values.astype("float32")
+        if np.array_equal(narrowed.astype("float64"), values):
+            values = narrowed
+        return _read_only(values)
+    return _read_only(series.to_numpy())
+
+
+def _read_only(values):
+    values = np.array(values, copy=True)
+    values.flags.writeable = False
+    return values
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+GRAM = 3
+
+
+class SubstringIndex:
+    """Case-insensitive substring search over a column, built once per dataset.
+
+    Rows are grouped by their distinct lowercased value and each distinct value
+    is indexed by its trigrams. A search intersects the posting lists of the
+    term's trigrams, confirms the few candidate values with ``in`` and returns
+    the row positions of the matches, so the cost follows the number of
+    candidates and matches rather than the number of rows. Terms shorter than
+    a trigram are checked against the distinct values only.
+    """
+
+    def __init__(self, values):
+        codes, distinct = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str).str.lower())
+        self.values = list(distinct)
+        self._rows = np.argsort(codes, kind="stable")
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(distinct)))])
+
+        postings = {}
+        for value_id, value in enumerate(self.values):
+            for gram in {value[i:i + GRAM] for i in range(len(value) - GRAM + 1)}:
+                postings.setdefault(gram, []).append(value_id)
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def matching_values(self, term):
+        """Ids of the distinct values containing ``term``."""
+        term = term.lower()
+        if len(term) < GRAM:
+            candidates = range(len(self.values))
+        else:
+            grams = {term[i:i + GRAM] for i in range(len(term) - GRAM + 1)}
+            lists = sorted((self._postings.get(gram, np.array([], dtype=np.int64)) for gram in grams), key=len)
+            candidates = lists[0]
+            for ids in lists[1:]:
+                if len(candidates) == 0:
+                    break
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        return np.array([i for i in candidates if term in self.values[i]], dtype=np.int64)
+
+    def search(self, term):
+        """Sorted row positions whose value contains ``term``."""
+        if not term:
+            return np.arange(len(self._rows))
+        ids = self.matching_values(term)
+        if len(ids) == 0:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate([self._rows[self._offsets[i]:self._offsets[i + 1]] for i in ids]))
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+import pyarrow as pa
+
+LATEST_FILE = "_latest.json"
+
+# The version of a dataset most recently stored, and when (wall clock, comparable across processes)
+StoredVersion = namedtuple("StoredVersion", ["version", "stored_at", "parts"])
+
+
+class FileLock:
+    """Cross-process lock held by exclusively creating ``path``.
+
+    Exclusive create is atomic on every OS and local filesystem, so no
+    platform locking API is needed. The file holds a token unique to this
+    holder, and it is only ever removed while it still holds that token. A
+    background thread refreshes its modification time while the lock is
+    held, so a lock file older than ``stale_after`` seconds was left by a
+    crashed process and is broken; at worst that repeats a build, since
+    stores are written atomically.
+    """
+
+    def __init__(self, path, timeout=None, stale_after=30 * 60, poll=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll = poll
+        self.token = None
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def acquire(self):
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        token = f"{os.getpid()}-{uuid.uuid4().hex}"
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder = self._holder()
+                try:
+                    age = time.time() - os.path.getmtime(self.path)
+                except FileNotFoundError:
+                    continue
+                if age > self.stale_after:
+                    logging.warning(f"Breaking lock {self.path} held for {age:.0f}s")
+                    self._remove(holder)
+                    continue
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(self.poll)
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(token)
+            self.token = token
+            self._stop.clear()
+            self._heartbeat = threading.Thread(target=self._refresh, name=f"lock-heartbeat:{self.path}", daemon=True)
+            self._heartbeat.start()
+            return
+
+    def release(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        self._remove(self.token)
+        self.token = None
+
+    def _refresh(self):
+        while not self._stop.wait(self.stale_after / 3):
+            if self._holder() != self.token:
+                logging.warning(f"Lock {self.path} was broken while held")
+                return
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                return
+
+    def _holder(self):
+        try:
+            with open(self.path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _remove(self, token):
+        # Only remove the file if it still holds ``token``: a lock broken as stale may
+        # already belong to another process
+        if token is None or self._holder() != token:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SharedDatasetStore:
+    """Datasets shared by every process on a node as memory-mapped Arrow IPC files.
+
+    A dataset is a dict of DataFrames stored under ``root/<name>/`` per
+    version. Readers map the files instead of reading them, so numeric,
+    date and categorical columns are read-only views of the same page
+    cache in every process rather than a private copy per replica. Building
+    or fetching a version is single-flight: the first process to take the
+    dataset's file lock does it and the others wait and map the result.
+    """
+
+    def __init__(self, root, lock_timeout=None, stale_lock_after=30 * 60, keep_versions=2):
+        self.root = root
+        self.lock_timeout = lock_timeout
+        self.stale_lock_after = stale_lock_after
+        self.keep_versions = keep_versions
+        os.makedirs(root, exist_ok=True)
+
+    def lock(self, name):
+        return FileLock(os.path.join(self.root, f"{name}.lock"), self.lock_timeout, self.stale_lock_after)
+
+    def _directory(self, name, version=None):
+        directory = os.path.join(self.root, name)
+        if version is None:
+            return directory
+        # Versions contain ':' and '/', which are not portable in file names
+        return os.path.join(directory, hashlib.sha1(version.encode()).hexdigest()[:16])
+
+    def latest(self, name):
+        try:
+            with open(os.path.join(self._directory(name), LATEST_FILE)) as f:
+                return StoredVersion(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def get(self, name, version):
+        """The stored frames of ``version``, mapped read-only, or None if it is not stored."""
+        directory = self._directory(name, version)
+        latest = self.latest(name)
+        parts = latest.parts if latest is not None and latest.version == version else None
+        if parts is None:
+            try:
+                parts = sorted(entry[:-len(".arrow")] for entry in os.listdir(directory) if entry.endswith(".arrow"))
+            except FileNotFoundError:
+                return None
+        try:
+            return {part: _read_frame(os.path.join(directory, f"{part}.arrow")) for part in parts}
+        except FileNotFoundError:
+            return None
+
+    def put(self, name, version, frames):
+        """Store ``frames`` as ``version`` (if not already stored), mark it latest and return the mapped frames."""
+        directory = self._directory(name, version)
+        if not os.path.isdir(directory):
+            tmp = f"{directory}.tmp-{os.getpid()}"
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            for part, frame in frames.items():
+                _write_frame(frame, os.path.join(tmp, f"{part}.arrow"))
+            os.replace(tmp, directory)
+            logging.info(f"Stored {name} version {version} in {directory}")
+        self._write_latest(name, StoredVersion(version, time.time(), sorted(frames)))
+        self._prune(name, keep=directory)
+        return self.get(name, version)
+
+    def get_or_build(self, name, version, build):
+        """The frames of ``version``, calling ``build()`` in one process only when it is not stored yet."""
+        frames = self.get(name, version)
+        if frames is None:
+            with self.lock(name):
+                frames = self.get(name, version)
+                if frames is None:
+                    frames = self.put(name, version, build())
+        return frames
+
+    def fetch_shared(self, name, max_age, fetch):
+        """``(version, frames)`` of ``name``, fetched at most once per ``max_age`` seconds across processes.
+
+        ``fetch()`` returns ``(version, frames)``; it runs only in the process
+        that finds the stored version missing or older than ``max_age``, and
+        every other process maps what it stored.
+        """
+        with self.lock(name):
+            latest = self.latest(name)
+            if latest is not None and time.time() - latest.stored_at <= max_age:
+                frames = self.get(name, latest.version)
+                if frames is not None:
+                    return latest.version, frames
+            version, frames = fetch()
+            return version, self.put(name, version, frames)
+
+    def _write_latest(self, name, stored):
+        path = os.path.join(self._directory(name), LATEST_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(stored._asdict(), f)
+        os.replace(path + ".tmp", path)
+
+    def _prune(self, name, keep):
+        # Old versions may still be mapped by other processes; where the OS refuses
+        # to delete mapped files (Windows) they are left for a later prune
+        parent = self._directory(name)
+        versions = []
+        for entry in os.scandir(parent):
+            if not entry.is_dir():
+                continue
+            if ".tmp-" in entry.name:
+                # A write unfinished for longer than a lock may be held was left by a crashed process
+                if time.time() - entry.stat().st_mtime > self.stale_lock_after:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+            versions.append(entry.path)
+        versions.sort(key=os.path.getmtime, reverse=True)
+        for directory in [v for v in versions if v != keep][self.keep_versions - 1:]:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _write_frame(frame, path):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_frame(path):
+    # Columns without nulls convert without copying, so they stay views of the mapped
+    # file; the map is released when the last of them is garbage collected
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas(split_blocks=True)
@@ -0,0 +1,119 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+METADATA_FILE = "_snapshot.json"
+
+
+class RetailSnapshot:
+    """On-disk Parquet snapshot of Retail_Sales, refreshed incrementally on a date watermark.
+
+    Each refresh appends the rows newer than the stored high-water mark as a new
+    ``part-NNNNN.parquet`` file. ``load`` reads every part through a memory map.
+    """
+
+    def __init__(self, path, watermark_column="date", max_parts=64):
+        self.path = path
+        self.watermark_column = watermark_column
+        self.max_parts = max_parts
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def metadata(self):
+        try:
+            with open(os.path.join(self.path, METADATA_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"watermark": None, "parts": 0, "rows": 0, "refreshed_at": None}
+
+    @property
+    def watermark(self):
+        watermark = self.metadata["watermark"]
+        return datetime.date.fromisoformat(watermark) if watermark else None
+
+    @property
+    def version(self):
+        """Changes whenever rows are appended; identifies the data a ``load`` returns."""
+        metadata = self.metadata
+        return f"{metadata['watermark']}/{metadata['rows']}"
+
+    def is_empty(self):
+        return self.metadata["parts"] == 0
+
+    def is_stale(self, max_age):
+        refreshed_at = self.metadata["refreshed_at"]
+        return refreshed_at is None or time.time() - refreshed_at > max_age
+
+    def refresh(self, fetch_since):
+        """Append rows returned by ``fetch_since(watermark)`` and advance the watermark.
+
+        ``fetch_since`` receives ``None`` when the snapshot is empty and must then
+        return the full table. Returns the number of rows appended.
+        """
+        with self._lock:
+            metadata = self.metadata
+            new_rows = fetch_since(self.watermark)
+            if not new_rows.empty:
+                part = os.path.join(self.path, f"part-{metadata['parts']:05d}.parquet")
+                pq.write_table(pa.Table.from_pandas(new_rows, preserve_index=False), part)
+                newest = pd.Timestamp(new_rows[self.watermark_column].max()).date()
+                metadata["watermark"] = max(newest, self.watermark or newest).isoformat()
+                metadata["parts"] += 1
+                metadata["rows"] += len(new_rows)
+            metadata["refreshed_at"] = time.time()
+            self._write_metadata(metadata)
+            if metadata["parts"] > self.max_parts:
+                self._compact()
+            return len(new_rows)
+
+    def load(self):
+        """Read the whole snapshot as a DataFrame (empty when nothing was fetched yet)."""
+        if self.is_empty():
+            return pd.DataFrame()
+        return pq.read_table(self.path, memory_map=True).to_pandas()
+
+    def _compact(self):
+        # Fold the accumulated daily parts back into a single file
+        metadata = self.metadata
+        table = pq.read_table(self.path)
+        parts = sorted(name for name in os.listdir(self.path) if name.startswith("part-"))
+        compacted = os.path.join(self.path, ".part-00000.parquet.tmp")
+        pq.write_table(table, compacted)
+        for name in parts:
+            os.remove(os.path.join(self.path, name))
+        os.replace(compacted, os.path.join(self.path, "part-00000.parquet"))
+        metadata["parts"] = 1
+        self._write_metadata(metadata)
+        logging.info(f"Compacted {len(parts)} snapshot parts in {self.path}")
+
+    def _write_metadata(self, metadata):
+        tmp = os.path.join(self.path, METADATA_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(metadata, f)
+        os.replace(tmp, os.path.join(self.path, METADATA_FILE))
+
+
+def share_snapshot(snapshot, store, name, refresh, build, current_version=None):
+    """Refresh ``snapshot`` and map its current version from a ``SharedDatasetStore``, under one node-wide lock.
+
+    ``refresh()`` tops the snapshot up; ``build(frame)`` turns the loaded rows
+    into the dict of frames stored as ``<name>:<snapshot version>``. Holding
+    the ``<name>-snapshot`` lock across all three steps means no other
+    process appends or compacts parts between reading the version and
+    reading the rows. Returns ``(version, frames)``, with frames None when
+    the version is still ``current_version``.
+    """
+    with store.lock(f"{name}-snapshot"):
+        refresh()
+        version = f"{name}:{snapshot.version}"
+        if version == current_version:
+            return version, None
+        return version, store.get_or_build(name, version, lambda: build(snapshot.load()))
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Named sizes for Retail_Sales-shaped data; 20k matches the current BigQuery table
+SIZES = {"20k": 20_607, "1m": 1_000_000, "10m": 10_000_000}
+
+STORES = ["Austin", "Boston", "Chicago", "Denver", "Los Angeles", "Miami", "New York", "Seattle"]
+CATEGORIES = ["Clothing", "Electronics", "Furniture", "Grocery", "Sports", "Toys"]
+FAKE_STORE_CATEGORIES = ["electronics", "jewelery", "men's clothing", "women's clothing"]
+
+# Raw export column names, as renamed by Data_Preprocessing.COLUMN_RENAMES
+RAW_COLUMNS = {"category": "product_category", "sales_revenue": "sales_revenue_(usd)",
+               "marketing_spend": "marketing_spend_(usd)"}
+
+
+def generate_retail_sales(rows, seed=0, products=200, start="2022-01-01", days=730):
+    """Deterministic frame with the Retail_Sales columns; ``rows`` may be a key of ``SIZES``."""
+    rows = SIZES.get(rows, rows)
+    rng = np.random.default_rng(seed)
+    product_ids = rng.integers(1, products + 1, rows)
+    # Each product belongs to one category, as in the real table
+    product_categories = np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), products + 1)]
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+    units_sold = rng.integers(1, 60, rows)
+    marketing_spend = np.round(rng.gamma(2.0, 150.0, rows), 2)
+    sales_revenue = np.round(units_sold * rng.uniform(5.0, 120.0, rows) + marketing_spend * rng.uniform(0.0, 1.5, rows), 2)
+    return pd.DataFrame({
+        "product_id": product_ids,
+        "store_location": np.array(STORES, dtype=object)[rng.integers(0, len(STORES), rows)],
+        "category": product_categories[product_ids],
+        "date": dates,
+        "day_of_the_week": np.array(dates.day_name(), dtype=object),
+        "sales_revenue": sales_revenue,
+        "marketing_spend": marketing_spend,
+        "units_sold": units_sold,
+    })
+
+
+def generate_raw_export(rows, seed=0, duplicate_fraction=0.05, null_fraction=0.01):
+    """Retail sales export as Data_Preprocessing receives it: raw headers, duplicates and gaps."""
+    frame = generate_retail_sales(rows, seed).rename(columns=RAW_COLUMNS)
+    rng = np.random.default_rng(seed + 1)
+    copies = rng.choice(len(frame), int(len(frame) * duplicate_fraction), replace=False)
+    half = len(copies) // 2
+    for column in frame.columns:
+        values = frame[column].to_numpy(copy=True)
+        values[copies[half:2 * half]] = values[copies[:half]]
+        frame[column] = values
+    frame["units_sold"] = frame["units_sold"].astype("float64")
+    frame.loc[rng.choice(len(frame), int(len(frame) * null_fraction), replace=False), "units_sold"] = np.nan
+    return frame
+
+
+def generate_fake_store(products=20, carts=7, users=10, seed=0, image_url="https://fakestoreapi.com/img/{id}.jpg"):
+    """Deterministic ``{"products", "carts", "users"}`` payloads shaped like the Fake Store API."""
+    rng = np.random.default_rng(seed)
+    product_payload = [{
+        "id": i,
+        "title": f"Product {i} {FAKE_STORE_CATEGORIES[i % len(FAKE_STORE_CATEGORIES)].title()}",
+        "price": float(np.round(rng.uniform(1.0, 1000.0), 2)),
+        "description": f"Description of product {i}",
+        "category": FAKE_STORE_CATEGORIES[i % len(FAKE_STORE_CATEGORIES)],
+        "image": image_url.format(id=i),
+        "rating": {"rate": float(np.round(rng.uniform(1.0, 5.0), 1)), "count": int(rng.integers(0, 500))},
+    } for i in range(1, products + 1)]
+    cart_payload = [{
+        "id": i,
+        "userId": int(rng.integers(1, users + 1)),
+        "date": (pd.Timestamp("2020-01-01") + pd.Timedelta(days=int(rng.integers(0, 90)))).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "products": [{"productId": int(product), "quantity": int(rng.integers(1, 10))}
+                     for product in rng.choice(np.arange(1, products + 1), min(products, int(rng.integers(1, 5))), replace=False)],
+        "__v": 0,
+    } for i in range(1, carts + 1)]
+    user_payload = [{
+        "id": i,
+        "email": f"user{i}@example.com",
+        "username": f"user{i}",
+        "password": "secret",
+        "name": {"firstname": f"First{i}", "lastname": f"Last{i}"},
+        "address": {"city": STORES[i % len(STORES)], "street": f"{i} Main St", "number": i, "zipcode": f"{10000 + i}"},
+        "phone": f"1-555-{i:04d}",
+        "__v": 0,
+    } for i in range(1, users + 1)]
+    return {"products": product_payload, "carts": cart_payload, "users": user_payload}
@@ -0,0 +1,161 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Default span log, overridden by the RETAIL_DASHBOARD_LOG environment variable
+TELEMETRY_LOG = "retail_dashboard.log"
+
+# Span records go to their own JSON-lines file, not to the root logger's console output
+logger = logging.getLogger("retail_dashboard.telemetry")
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+_local = threading.local()
+_totals_lock = threading.Lock()
+_cache_totals = {}
+
+
+def log_to(path=None):
+    """Send span records to ``path``, one JSON object per line; calling again is a no-op.
+
+    Without ``path``, RETAIL_DASHBOARD_LOG is read now rather than at import,
+    so a harness that imported this module first can still redirect the log.
+    """
+    path = os.path.abspath(path or os.environ.get("RETAIL_DASHBOARD_LOG", TELEMETRY_LOG))
+    if not any(getattr(handler, "baseFilename", None) == path for handler in logger.handlers):
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+class RerunTrace:
+    """Timing spans and cache lookups of one script rerun.
+
+    Spans are written to the telemetry log as they close, so a rerun cut
+    short by ``st.stop()`` or an exception still leaves its stages behind.
+    """
+
+    def __init__(self, page, session=None, log=True):
+        self.page = page
+        self.log = log
+        self.session = session
+        self.rerun = uuid.uuid4().hex[:12]
+        self.spans = []
+        self.cache = {}
+        self.started = time.perf_counter()
+        self._depth = 0
+        self._lookups = []
+
+    def _emit(self, record):
+        if not self.log:
+            return
+        record = {"ts": round(time.time(), 3), "rerun": self.rerun, "session": self.session, "page": self.page, **record}
+        logger.info(json.dumps(record, default=str))
+
+    @contextmanager
+    def span(self, stage, name=None, **attrs):
+        """Time the enclosed block as ``stage`` (fetch, cache, filter, aggregate, reduce, render)."""
+        started = time.perf_counter()
+        record = {"stage": stage, "name": name, "depth": self._depth,
+                  "start": round((started - self.started) * 1e3, 3), **attrs}
+        self._depth += 1
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            self._depth -= 1
+            record["ms"] = round((time.perf_counter() - started) * 1e3, 3)
+            self.spans.append(record)
+            self._emit(record)
+
+    @contextmanager
+    def cache_lookup(self, name):
+        """Span around a cached call; a hit unless ``mark_cache_miss`` runs inside it."""
+        with self.span("cache", name) as record:
+            self._lookups.append(record)
+            try:
+                yield record
+            finally:
+                self._lookups.pop()
+                record.setdefault("cache", "hit")
+                counts = self.cache.setdefault(name, {"hits": 0, "misses": 0})
+                counts["hits" if record["cache"] == "hit" else "misses"] += 1
+                _count_total(name, record["cache"])
+
+    def mark_cache_miss(self):
+        if self._lookups:
+            self._lookups[-1]["cache"] = "miss"
+
+    def finish(self):
+        """Log the rerun total with its cache counts and return it in milliseconds."""
+        total = round((time.perf_counter() - self.started) * 1e3, 3)
+        self._emit({"stage": "rerun", "ms": total, "cache_counts": self.cache})
+        return total
+
+    def breakdown(self):
+        """Closed spans in start order, indented by nesting, for display."""
+        spans = sorted(self.spans, key=lambda span: span["start"])
+        return pd.DataFrame({
+            "Stage": ["  " * span["depth"] + span["stage"] for span in spans],
+            "Name": [span["name"] or "" for span in spans],
+            "ms": [span["ms"] for span in spans],
+        })
+
+    def cache_table(self):
+        """Hits and misses per cache in this rerun next to the server-wide totals."""
+        totals = cache_totals()
+        rows = [{"Cache": name,
+                 "Hits": self.cache.get(name, {}).get("hits", 0),
+                 "Misses": self.cache.get(name, {}).get("misses", 0),
+                 "Server Hits": counts["hits"],
+                 "Server Misses": counts["misses"]} for name, counts in sorted(totals.items())]
+        return pd.DataFrame(rows, columns=["Cache", "Hits", "Misses", "Server Hits", "Server Misses"])
+
+
+def _count_total(name, outcome):
+    with _totals_lock:
+        counts = _cache_totals.setdefault(name, {"hits": 0, "misses": 0})
+        counts["hits" if outcome == "hit" else "misses"] += 1
+
+
+def cache_totals():
+    """Hit/miss counts per cache since the server started, across all sessions."""
+    with _totals_lock:
+        return {name: dict(counts) for name, counts in _cache_totals.items()}
+
+
+def start_rerun(page, session=None):
+    """Begin tracing a rerun on this thread and return its ``RerunTrace``."""
+    _local.trace = RerunTrace(page, session)
+    return _local.trace
+
+
+def current_trace():
+    """The trace of the rerun running on this thread, or an unlogged one outside a rerun."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        trace = _local.trace = RerunTrace(None, log=False)
+    return trace
+
+
+def traced_job(page):
+    """Give a function run off the script thread (a background refresh) its own logged trace."""
+    def decorate(function):
+        @functools.wraps(function)
+        def run(*args, **kwargs):
+            trace = start_rerun(page)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                trace.finish()
+        return run
+    return decorate
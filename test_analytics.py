@@ -0,0 +1,83 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from analytics import DATASET_VERSION, AnalyticsEngine, FakeStoreData, MemoCache, RetailData, sizeof
+from row_index import sort_for_index
+from schema import apply_retail_schema
+
+@pytest.fixture
+def retail(sales_rows):
+    frame = apply_retail_schema(sort_for_index(sales_rows))
+    frame.attrs[DATASET_VERSION] = "retail:v1"
+    return RetailData(frame)
+
+@pytest.fixture
+def fake_store():
+    products = pd.DataFrame({"Product ID": [1, 2, 3], "Product Name": ["Red Shirt", "Blue Shirt", "Gold Ring"],
+                             "Category": ["clothing", "clothing", "jewelery"], "Price": [10.0, 25.0, 300.0]})
+    carts = pd.DataFrame({"Cart ID": [1, 1, 2], "User ID": [1, 1, 2], "Product ID": [1, 3, 2],
+                          "Quantity": [2, 1, 4], "Line Total": [20.0, 300.0, 100.0]})
+    users = pd.DataFrame({"User ID": [1, 2], "Email": ["a@example.com", "b@example.com"]})
+    return FakeStoreData(products, carts, users, version="fake_store:v1")
+
+def test_retail_views(retail):
+    """Test the retail views against sums worked out from the fixture rows."""
+    assert analytics.total_sales_revenue(retail, "Austin") == 180.0
+    assert analytics.total_sales_revenue(retail, "Austin", category_contains="elec") == 130.0
+    trend = analytics.sales_trend(retail, datetime.date(2024, 1, 2), datetime.date(2024, 1, 3))
+    assert trend["sales_revenue"].tolist() == [70.0, 50.0]
+    assert analytics.sales_by_weekday(retail, category="Clothing").set_index("day_of_the_week")["sales_revenue"].to_dict() == {"Monday": 50.0, "Wednesday": 20.0}
+    points, binned = analytics.marketing_vs_units(retail, "Boston")
+    assert not binned and list(points.columns) == ["marketing_spend", "units_sold", "category"]
+    cells, binned = analytics.marketing_vs_units(retail, "Austin", max_points=2)
+    assert binned and cells["count"].sum() == 3
+    assert analytics.marketing_distribution(retail, "Austin", bins=2)["count"].sum() == 3
+
+def test_fake_store_views(fake_store):
+    """Test the product, cart and user filters behave like the dashboard widgets."""
+    assert analytics.filter_products(fake_store, search="shirt")["Product ID"].tolist() == [1, 2]
+    assert analytics.filter_products(fake_store, categories=["jewelery"], max_price=100.0).empty
+    assert analytics.top_products(fake_store, top_n=1, search="shirt")["Product Name"].tolist() == ["Blue Shirt"]
+    assert analytics.filter_carts(fake_store, user=1, min_quantity=2)["Quantity"].tolist() == [2]
+    assert analytics.cart_values(fake_store)["Cart Value"].tolist() == [320.0, 100.0]
+    assert analytics.user_purchase_frequency(fake_store, user=None)["User ID"].tolist() == [1, 2]
+
+def test_engine_memoizes_by_version_and_params(retail):
+    """Test repeated filters hit the cache, numpy widget values share keys and a reload misses."""
+    engine = AnalyticsEngine()
+    first = engine.run(analytics.sales_by_product, retail, store_location="Austin")
+    assert engine.run(analytics.sales_by_product, retail, store_location=np.str_("Austin")) is first
+    engine.run(analytics.sales_by_product, retail, store_location="Boston")
+    reloaded = RetailData(retail.frame, version="retail:v2")
+    engine.run(analytics.sales_by_product, reloaded, store_location="Austin")
+    stats = engine.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
+    assert stats["hit_rate"] == 0.25
+
+def test_unversioned_data_is_not_cached(retail):
+    """Test datasets without a version are computed every time."""
+    frame = retail.frame.copy()
+    frame.attrs.clear()
+    engine = AnalyticsEngine()
+    engine.run(analytics.sales_by_product, RetailData(frame), store_location="Austin")
+    assert engine.stats()["entries"] == 0
+
+def test_memo_cache_evicts_by_size():
+    """Test the cache stays under its byte budget, evicting the least recently used entries."""
+    frame = pd.DataFrame({"x": np.zeros(1_000)})
+    cache = MemoCache(max_bytes=sizeof(frame) * 2 + 1)
+    cache["a"], cache["b"] = frame, frame.copy()
+    cache["a"]
+    cache["c"] = frame.copy()
+    assert set(cache) == {"a", "c"}
+    assert cache.evictions == 1 and cache.currsize <= cache.maxsize
+
+def test_oversized_results_are_not_cached(retail):
+    """Test a result larger than the whole budget is returned but not stored."""
+    engine = AnalyticsEngine(max_bytes=100)
+    assert len(engine.run(analytics.sales_by_product, retail, store_location="Austin")) == 3
+    assert engine.stats()["entries"] == 0
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+import requests
+
+from api_client import FakeStoreClient
+
+@pytest.fixture
+def fake_store(stub_server):
+    stub_server.add_json("/products", [{"id": 1, "title": "Product A", "price": 29.99}])
+    stub_server.add_json("/carts", [{"id": 1, "userId": 1, "products": [{"productId": 1, "quantity": 2}]}])
+    stub_server.add_json("/users", [{"id": 1, "email": "a@example.com"}])
+    return stub_server
+
+def test_fetch_all_runs_endpoints_concurrently(fake_store):
+    """Test that the three endpoints are fetched in parallel over one session."""
+    fake_store.delay = 0.3
+    client = FakeStoreClient(fake_store.url)
+    started = time.perf_counter()
+    payloads = client.fetch_all()
+    elapsed = time.perf_counter() - started
+    assert payloads["products"][0]["title"] == "Product A"
+    assert payloads["carts"][0]["products"][0]["quantity"] == 2
+    assert payloads["users"][0]["id"] == 1
+    assert elapsed < 0.8
+    client.close()
+
+def test_transient_errors_are_retried(fake_store):
+    """Test bounded retries with backoff on 503 responses."""
+    fake_store.failures["/products"] = 2
+    client = FakeStoreClient(fake_store.url, retries=3, backoff_factor=0.01)
+    assert client.get_json("products")[0]["id"] == 1
+    assert fake_store.requests.count("/products") == 3
+
+def test_retries_are_bounded(fake_store):
+    """Test that a persistently failing endpoint raises instead of looping."""
+    fake_store.failures["/users"] = 10
+    client = FakeStoreClient(fake_store.url, retries=1, backoff_factor=0.01)
+    with pytest.raises(requests.exceptions.RequestException):
+        client.fetch_all()
+    assert fake_store.requests.count("/users") == 2
+
+def test_requests_time_out(fake_store):
+    """Test that a hanging server fails fast instead of blocking forever."""
+    fake_store.delay = 1.0
+    client = FakeStoreClient(fake_store.url, timeout=0.2, retries=1, backoff_factor=0.01)
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get_json("products")
+    assert time.perf_counter() - started < 0.9
@@ -0,0 +1,75 @@
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from bigquery_loader import RETAIL_COLUMNS, build_incremental_query, frame_from_batches, load_retail_since
+from snapshot import RetailSnapshot
+
+def arrow_rows(sales_rows):
+    return pa.Table.from_pandas(sales_rows.assign(date=pd.to_datetime(sales_rows["date"]).dt.date), preserve_index=False)
+
+class FakeArrowClient:
+    """Stands in for BigQuery: records each query and streams the rows past its watermark in small Arrow batches."""
+
+    def __init__(self, table, batch_rows=2):
+        self.table = table
+        self.batch_rows = batch_rows
+        self.queries = []
+
+    def query(self, sql, job_config=None):
+        params = {p.name: p.value for p in job_config.query_parameters}
+        self.queries.append((sql, params))
+        return self
+
+    def result(self, page_size=None):
+        return self
+
+    def to_arrow_iterable(self, bqstorage_client=None):
+        table = self.table
+        watermark = self.queries[-1][1].get("watermark")
+        if watermark is not None:
+            table = table.filter(pc.greater(table["date"], pa.scalar(watermark, pa.date32())))
+        return iter(table.to_batches(max_chunksize=self.batch_rows))
+
+def test_query_selects_only_dashboard_columns():
+    """Test column projection and the watermark filter."""
+    sql, params = build_incremental_query("Retail_Sales")
+    assert sql == f"SELECT {', '.join(RETAIL_COLUMNS)} FROM Retail_Sales"
+    assert params == {}
+    sql, params = build_incremental_query("Retail_Sales", ["date", "units_sold"], watermark=datetime.date(2024, 1, 2))
+    assert sql == "SELECT date, units_sold FROM Retail_Sales WHERE date > @watermark"
+    assert params == {"watermark": datetime.date(2024, 1, 2)}
+
+def test_batches_load_as_categoricals_and_dates(sales_rows):
+    """Test that streamed batches are reassembled with compact dtypes and unchanged values."""
+    client = FakeArrowClient(arrow_rows(sales_rows))
+    frame = load_retail_since(client, "Retail_Sales", watermark=datetime.date(2023, 12, 31))
+    assert client.queries[0][1] == {"watermark": datetime.date(2023, 12, 31)}
+    for column in ("store_location", "category", "day_of_the_week"):
+        assert isinstance(frame[column].dtype, pd.CategoricalDtype)
+        assert frame[column].astype(str).tolist() == sales_rows[column].tolist()
+    assert frame["date"].dtype.name == "dbdate"
+    assert frame["date"].astype(str).tolist() == sales_rows["date"].tolist()
+    assert frame["sales_revenue"].tolist() == sales_rows["sales_revenue"].tolist()
+
+def test_empty_stream_returns_empty_frame():
+    """Test that a query with no new rows gives an empty frame with the projected columns."""
+    frame = frame_from_batches(iter([]))
+    assert frame.empty
+    assert list(frame.columns) == list(RETAIL_COLUMNS)
+
+def test_loaded_frame_refreshes_snapshot(tmp_path, sales_rows):
+    """Test that the Arrow-loaded frame can be appended to the parquet snapshot."""
+    client = FakeArrowClient(arrow_rows(sales_rows.iloc[:3]))
+    snapshot = RetailSnapshot(str(tmp_path))
+    fetch = lambda watermark: load_retail_since(client, "Retail_Sales", watermark)
+    assert snapshot.refresh(fetch) == 3
+    assert snapshot.watermark == datetime.date(2024, 1, 2)
+    client.table = arrow_rows(sales_rows)
+    assert snapshot.refresh(fetch) == 2
+    assert snapshot.refresh(fetch) == 0
+    loaded = snapshot.load()
+    assert len(loaded) == len(sales_rows)
+    assert loaded["category"].astype(str).tolist() == sales_rows["category"].tolist()
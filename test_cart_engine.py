@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cart_engine import build_cart_lines, cart_totals, price_cart_lines
+
+CARTS = [
+    {"id": 1, "userId": 1, "date": "2020-03-02T00:00:00.000Z",
+     "products": [{"productId": 1, "quantity": 4}, {"productId": 2, "quantity": 1}], "__v": 0},
+    {"id": 2, "userId": 1, "date": "2020-01-02T00:00:00.000Z", "products": [{"productId": 2, "quantity": 3}], "__v": 0},
+    {"id": 3, "userId": 2, "date": "2020-03-01T00:00:00.000Z",
+     "products": [{"productId": 1, "quantity": 1}, {"productId": 99, "quantity": 5}], "__v": 0},
+    {"id": 4, "userId": 3, "date": "2020-03-01T00:00:00.000Z", "products": [], "__v": 0},
+]
+
+@pytest.fixture
+def products():
+    return pd.DataFrame({"Product ID": [2, 1], "Product Name": ["Product B", "Product A"], "Price": [49.99, 29.99]})
+
+def test_cart_lines_have_correct_keys():
+    """Test one row per (cart, product) with the real product ids."""
+    lines = build_cart_lines(CARTS)
+    assert lines["Cart ID"].tolist() == [1, 1, 2, 3, 3]
+    assert lines["User ID"].tolist() == [1, 1, 1, 2, 2]
+    assert lines["Product ID"].tolist() == [1, 2, 2, 1, 99]
+    assert lines["Quantity"].tolist() == [4, 1, 3, 1, 5]
+    assert str(lines["Date"].iloc[2].date()) == "2020-01-02"
+
+def test_prices_joined_by_product_id(products):
+    """Test the catalog join and line totals, including products missing from the catalog."""
+    priced = price_cart_lines(build_cart_lines(CARTS), products)
+    assert priced["Product Name"].tolist()[:4] == ["Product A", "Product B", "Product B", "Product A"]
+    assert priced["Line Total"].iloc[0] == pytest.approx(4 * 29.99)
+    assert np.isnan(priced["Product Price"].iloc[4])
+
+def test_cart_totals(products):
+    """Test per-cart values and item counts."""
+    priced = price_cart_lines(build_cart_lines(CARTS), products)
+    carts = cart_totals(priced).set_index("Cart ID")
+    assert carts.loc[1, "Cart Value"] == pytest.approx(4 * 29.99 + 49.99)
+    assert carts.loc[3, "Cart Value"] == pytest.approx(29.99)
+    assert carts.loc[3, "Items"] == 6
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from cube import build_cube
+
+@pytest.fixture
+def cube(sales_rows):
+    return build_cube(sales_rows)
+
+def test_store_product_sums_match_groupby(cube, sales_rows):
+    """Test cube lookups against a groupby over the raw rows."""
+    result = cube.query(["sales_revenue"], ["product_id"], store_location="Austin")
+    expected = sales_rows[sales_rows["store_location"] == "Austin"].groupby("product_id")["sales_revenue"].sum()
+    assert result.set_index("product_id")["sales_revenue"].to_dict() == expected.to_dict()
+
+def test_total_with_category_search(cube):
+    """Test an ungrouped total filtered by a category substring."""
+    total = cube.query(["sales_revenue"], store_location="Austin", category_contains="elec")
+    assert total["sales_revenue"].iloc[0] == 130.0
+    assert cube.query(["sales_revenue"], store_location="Nowhere")["sales_revenue"].iloc[0] == 0
+
+def test_smallest_covering_rollup_is_used(cube):
+    """Test rollup selection and that unsupported groupings are rejected."""
+    by_day = cube.query(["units_sold"], ["day_of_the_week"], category="Electronics")
+    assert by_day.set_index("day_of_the_week")["units_sold"].to_dict() == {"Monday": 4, "Tuesday": 3, "Wednesday": 1}
+    assert by_day["day_of_the_week"].dtype == object
+    with pytest.raises(KeyError):
+        cube.query(["sales_revenue"], ["product_id", "date"])
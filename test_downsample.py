@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from downsample import bin_2d, lttb, minmax
+
+def series(rows=10_000, spike=4_321):
+    values = np.sin(np.arange(rows) / 50.0)
+    values[spike] = 100.0
+    return pd.DataFrame({"date": pd.date_range("2022-01-01", periods=rows, freq="h"), "sales_revenue": values})
+
+def test_short_series_pass_through():
+    """Test frames within the cap are returned as they are."""
+    frame = series(rows=100, spike=10)
+    assert lttb(frame, "date", "sales_revenue", 100) is frame
+    assert minmax(frame, "date", "sales_revenue", 500) is frame
+
+def test_lttb_keeps_ends_and_spikes():
+    """Test LTTB returns exactly the cap, in date order, with the endpoints and the outlier."""
+    frame = series()
+    reduced = lttb(frame.sample(frac=1, random_state=0), "date", "sales_revenue", 500)
+    assert len(reduced) == 500
+    assert reduced["date"].is_monotonic_increasing
+    assert reduced.index[0] == 0 and reduced.index[-1] == len(frame) - 1
+    assert 4_321 in reduced.index
+
+def test_minmax_keeps_bucket_extremes():
+    """Test min/max bucketing stays under the cap and keeps the global extremes."""
+    frame = series()
+    reduced = minmax(frame, "date", "sales_revenue", 300)
+    assert len(reduced) <= 300
+    assert reduced["sales_revenue"].max() == 100.0
+    assert reduced["sales_revenue"].min() == frame["sales_revenue"].min()
+
+def test_bin_2d_counts_every_row():
+    """Test the heatmap cells cover all non-missing rows and only non-empty cells are returned."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"marketing_spend": rng.gamma(2.0, 150.0, 5_000), "units_sold": rng.integers(1, 60, 5_000)})
+    frame.loc[0, "marketing_spend"] = np.nan
+    cells = bin_2d(frame, "marketing_spend", "units_sold", bins=10)
+    assert cells["count"].sum() == 4_999
+    assert (cells["count"] > 0).all() and len(cells) <= 100
+    assert (cells["marketing_spend_end"] > cells["marketing_spend_start"]).all()
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from histograms import histogram_bins, histogram_chart
+
+def test_bins_match_numpy_and_skip_missing():
+    """Test the bin counts equal np.histogram over the non-missing values."""
+    values = pd.Series([1.0, 2.0, 2.5, np.nan, 9.0, 10.0])
+    binned = histogram_bins(values, bins=3)
+    counts, edges = np.histogram([1.0, 2.0, 2.5, 9.0, 10.0], bins=3)
+    assert binned["count"].tolist() == counts.tolist()
+    assert binned["bin_start"].tolist() == edges[:-1].tolist()
+    assert binned["bin_end"].iloc[-1] == 10.0
+
+def test_chart_ships_only_bin_counts():
+    """Test the chart spec carries one row per bin rather than the raw values."""
+    spec = histogram_chart(histogram_bins(np.arange(10_000), bins=20), "Price").to_dict()
+    assert len(next(iter(spec["datasets"].values()))) == 20
@@ -0,0 +1,80 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from image_cache import ThumbnailCache, make_thumbnail, placeholder_image
+
+def image_bytes(size=(600, 800), mode="RGB", format="PNG"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, format)
+    return buffer.getvalue()
+
+@pytest.fixture
+def images(stub_server):
+    for i in range(6):
+        stub_server.routes[f"/img/{i}.png"] = (image_bytes(), "image/png")
+    return [f"{stub_server.url}/img/{i}.png" for i in range(6)]
+
+def test_thumbnail_fits_the_bounding_box():
+    """Test downscaling keeps the aspect ratio and flattens transparency to JPEG."""
+    with Image.open(io.BytesIO(make_thumbnail(image_bytes((600, 800), "RGBA"), 150))) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (112, 150)
+
+def test_thumbnails_are_fetched_once(tmp_path, stub_server, images):
+    """Test concurrent prefetch, then serving every image from disk with no further requests."""
+    cache = ThumbnailCache(str(tmp_path))
+    cache.prefetch_in_background(images).join()
+    assert len(stub_server.requests) == 6
+    paths = cache.thumbnails(images + images[:2])
+    assert len(stub_server.requests) == 6
+    assert all(os.path.exists(path) for path in paths.values())
+    assert cache.stats()["images"] == 6
+
+def test_failed_downloads_are_not_cached(tmp_path, stub_server, images):
+    """Test that a missing or broken image gives None instead of raising."""
+    stub_server.routes["/img/broken.png"] = (b"not an image", "image/png")
+    cache = ThumbnailCache(str(tmp_path))
+    paths = cache.thumbnails([images[0], f"{stub_server.url}/img/missing.png", f"{stub_server.url}/img/broken.png"])
+    assert paths[images[0]] is not None
+    assert paths[f"{stub_server.url}/img/missing.png"] is None
+    assert paths[f"{stub_server.url}/img/broken.png"] is None
+
+def test_failures_are_not_retried_until_retry_after(tmp_path, stub_server, images, monkeypatch):
+    """Test that a failed or oversized image is requested once per retry_after, not once per call."""
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    cache = ThumbnailCache(str(tmp_path), retry_after=60)
+    missing = f"{stub_server.url}/img/missing.png"
+    assert cache.thumbnails([missing, images[0]]) == {missing: None, images[0]: None}
+    assert cache.thumbnails([missing, images[0]]) == {missing: None, images[0]: None}
+    assert len(stub_server.requests) == 2
+    monkeypatch.undo()
+    assert ThumbnailCache(str(tmp_path), retry_after=0).fetch(images[0]) is not None
+
+def test_cached_lookup_never_downloads(tmp_path, stub_server, images):
+    """Test the render path: cached paths only, with missing images prefetched once in the background."""
+    cache = ThumbnailCache(str(tmp_path))
+    assert cache.cached(images[:2]) == {images[0]: None, images[1]: None}
+    assert stub_server.requests == []
+    threads = [cache.prefetch_in_background(images[:2]) for _ in range(3)]
+    for thread in threads:
+        thread.join()
+    assert len(stub_server.requests) == 2
+    assert all(cache.cached(images[:2]).values())
+    with Image.open(io.BytesIO(placeholder_image(150))) as placeholder:
+        assert placeholder.size == (150, 150)
+
+def test_least_recently_used_thumbnails_are_evicted(tmp_path, images):
+    """Test that the cache stays within max_bytes by dropping the least recently read files."""
+    cache = ThumbnailCache(str(tmp_path))
+    cache.thumbnails(images[:3])
+    size = max(os.path.getsize(cache.path(url)) for url in images[:3])
+    for age, url in zip((300, 200, 100), images[:3]):
+        os.utime(cache.path(url), (os.path.getatime(cache.path(url)) - age,) * 2)
+    cache.get(images[0])
+    cache.max_bytes = 3 * size
+    cache.thumbnails(images[3:4])
+    assert cache.get(images[1]) is None
+    assert cache.get(images[0]) is not None and cache.get(images[3]) is not None
@@ -0,0 +1,42 @@
+import json
+import urllib.request
+
+import pytest
+
+from benchmarks.loadtest import check_budgets, percentile, serve_fake_store
+
+def make_report(**overrides):
+    report = {"p50_ms": 100.0, "p95_ms": 400.0, "memory_per_session_mb": 3.0,
+              "analytics_cache": {"hit_rate": 0.6}, "errors": []}
+    report.update(overrides)
+    return report
+
+def test_percentile_interpolates_between_ranks():
+    """Test p50/p95 on a known distribution."""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 95) == pytest.approx(95.05)
+    assert percentile([7.0], 95) == 7.0
+
+def test_budgets_report_every_violation():
+    """Test that latency, memory, hit-rate budgets and script errors all fail the run."""
+    assert check_budgets(make_report(), p50_ms=200, p95_ms=500, memory_per_session_mb=5, min_hit_rate=0.5) == []
+    violations = check_budgets(make_report(p95_ms=900.0, memory_per_session_mb=8.0, errors=["view: boom"]),
+                               p50_ms=200, p95_ms=500, memory_per_session_mb=5, min_hit_rate=0.7)
+    assert len(violations) == 4
+    assert violations[0] == "rerun raised: view: boom"
+    assert check_budgets(make_report(p95_ms=900.0)) == []
+
+def test_stand_in_api_serves_payloads_and_images():
+    """Test the local Fake Store server used by the load test."""
+    server = serve_fake_store()
+    server.payloads["products"] = [{"id": 1}]
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urllib.request.urlopen(f"{url}/products") as response:
+            assert json.load(response) == [{"id": 1}]
+        with urllib.request.urlopen(f"{url}/img/1.jpg") as response:
+            assert response.headers["Content-Type"] == "image/jpeg"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,15 @@
+from pagination import FramePages, page_count
+
+def test_page_count():
+    """Test page arithmetic, including the empty case."""
+    assert page_count(0, 10) == 1
+    assert page_count(10, 10) == 1
+    assert page_count(11, 10) == 2
+
+def test_frame_pages(sales_rows):
+    """Test that pages are slices of the frame, with a short last page."""
+    pages = FramePages(sales_rows)
+    assert pages.count() == 5
+    assert pages.page(1, 2)["sales_revenue"].tolist() == [100.0, 50.0]
+    assert pages.page(3, 2)["sales_revenue"].tolist() == [20.0]
+    assert pages.page(4, 2).empty
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Data_Preprocessing import RowHashSet, clean_retail_export, clean_retail_exports_parallel, main, plan_shards
+
+RAW_EXPORT = """product_id, store_location ,product_category,units_sold,sales_revenue_(usd),marketing_spend_(usd)
+1,Austin,Electronics,4,100.5,10
+2,Austin,Clothing,2,50,5
+1,Austin,Electronics,4,100.5,10
+3,Boston,,1,30,3
+2,Austin,Clothing,2,50,5
+4,Boston,Grocery,7,70.25,7
+1,Austin,Electronics,4,100.5,10
+"""
+
+@pytest.fixture
+def export_file(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(RAW_EXPORT)
+    return path
+
+def in_memory_clean(path):
+    """The original whole-file cleaning steps, used as the reference result."""
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    df = df.drop_duplicates().dropna()
+    return df.rename(columns={"product_category": "category", "sales_revenue_(usd)": "sales_revenue",
+                              "marketing_spend_(usd)": "marketing_spend"}).reset_index(drop=True)
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 100])
+def test_streaming_matches_in_memory_cleaning(export_file, tmp_path, chunksize):
+    """Test that chunked cleaning removes duplicates across chunk boundaries."""
+    output = tmp_path / "clean.parquet"
+    stats = clean_retail_export(str(export_file), str(output), chunksize=chunksize)
+    cleaned = pd.read_parquet(output)
+    expected = in_memory_clean(export_file)
+    pd.testing.assert_frame_equal(cleaned, expected, check_dtype=False)
+    assert stats == {"rows_read": 7, "rows_written": 3}
+
+@pytest.mark.parametrize("output_name", ["clean.parquet", "clean.csv"])
+def test_schema_comes_from_first_non_empty_chunk(tmp_path, output_name):
+    """Test that a first chunk emptied by dropna does not fix null-typed text columns."""
+    export = tmp_path / "export.csv"
+    export.write_text(RAW_EXPORT.splitlines()[0] + "\n3,Boston,,1,30,3\n4,Boston,Grocery,7,70.25,7\n5,Denver,Toys,1,9.5,1\n")
+    output = tmp_path / output_name
+    assert clean_retail_export(str(export), str(output), chunksize=1)["rows_written"] == 2
+    cleaned = pd.read_parquet(output) if output_name.endswith(".parquet") else pd.read_csv(output)
+    assert cleaned["store_location"].tolist() == ["Boston", "Denver"]
+    export.write_text(RAW_EXPORT.splitlines()[0] + "\n3,Boston,,1,30,3\n")
+    assert clean_retail_export(str(export), str(tmp_path / "empty.parquet"))["rows_written"] == 0
+    assert list(pd.read_parquet(tmp_path / "empty.parquet").columns) == list(cleaned.columns)
+
+def test_csv_output_and_cli(export_file, tmp_path):
+    """Test the command-line entry point with CSV output."""
+    output = tmp_path / "Retail_Sales.csv"
+    main([str(export_file), "-o", str(output), "--chunksize", "2"])
+    cleaned = pd.read_csv(output)
+    assert list(cleaned.columns) == ["product_id", "store_location", "category", "units_sold",
+                                     "sales_revenue", "marketing_spend"]
+    assert cleaned["product_id"].tolist() == [1, 2, 4]
+
+def test_row_hash_set_merges_runs():
+    """Test membership across merged runs and first-occurrence selection."""
+    seen = RowHashSet()
+    for start in range(0, 1000, 100):
+        seen.add(np.arange(start, start + 100, dtype=np.uint64))
+    assert len(seen.runs) < 10
+    assert len(seen) == 1000
+    assert seen.contains(np.array([5, 999, 1000], dtype=np.uint64)).tolist() == [True, True, False]
+    keep = seen.keep_first_seen(np.array([1000, 3, 1000, 1001], dtype=np.uint64))
+    assert keep.tolist() == [True, False, False, True]
+
+def test_shards_cover_file_at_line_boundaries(export_file):
+    """Test that byte-range shards split only at line starts and cover every row."""
+    shards = plan_shards([str(export_file)], 3)
+    assert len(shards) == 3
+    data = export_file.read_bytes()
+    header = data[:data.index(b"\n") + 1]
+    assert all(shard[3] == header for shard in shards)
+    assert b"".join(data[start:stop] for _, start, stop, _ in shards) == data[len(header):]
+    assert all(data[start - 1:start] == b"\n" for _, start, _, _ in shards)
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_matches_single_process(export_file, tmp_path, workers):
+    """Test that sharded cleaning reconciles duplicates across shards and files."""
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "a.csv").write_text(RAW_EXPORT)
+    (exports / "b.csv").write_text(RAW_EXPORT.splitlines()[0] + "\n5,Denver,Toys,1,9.5,1\n2,Austin,Clothing,2,50,5\n")
+    output = tmp_path / "clean.parquet"
+    stats = clean_retail_exports_parallel(str(exports), str(output), workers=workers, chunksize=2)
+    cleaned = pd.read_parquet(output)
+    assert cleaned["product_id"].tolist() == [1, 2, 4, 5]
+    assert stats == {"rows_read": 9, "rows_written": 4}
+    assert not list(tmp_path.glob("retail_shards_*"))
+
+def test_parallel_shards_starting_with_dropped_rows(tmp_path):
+    """Test shards whose first chunks, or all of whose rows, are dropped by the cleaning steps."""
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    header = RAW_EXPORT.splitlines()[0]
+    (exports / "a.csv").write_text(header + "\n3,Boston,,1,30,3\n4,Boston,Grocery,7,70.25,7\n")
+    (exports / "b.csv").write_text(header + "\n6,,Toys,1,9.5,1\n")
+    (exports / "c.csv").write_text(header + "\n7,Denver,,1,9.5,1\n5,Denver,Toys,1,9.5,1\n4,Boston,Grocery,7,70.25,7\n")
+    output = tmp_path / "clean.parquet"
+    stats = clean_retail_exports_parallel(str(exports), str(output), workers=3, chunksize=1)
+    assert pd.read_parquet(output)["product_id"].tolist() == [4, 5]
+    assert stats == {"rows_read": 6, "rows_written": 2}
+def test_parallel_header_only_input_writes_empty_schema(tmp_path):
+    """Test that a header-only export yields the same empty file as the single-process path."""
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "a.csv").write_text(RAW_EXPORT.splitlines()[0] + "\n")
+    stats = clean_retail_exports_parallel(str(exports), str(tmp_path / "parallel.parquet"), workers=2)
+    clean_retail_export(str(exports / "a.csv"), str(tmp_path / "single.parquet"))
+    assert stats == {"rows_read": 0, "rows_written": 0}
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "parallel.parquet"), pd.read_parquet(tmp_path / "single.parquet"))
+    assert "sales_revenue" in pd.read_parquet(tmp_path / "parallel.parquet").columns
+def test_parallel_empty_directory(tmp_path):
+    """Test that a directory without CSV exports is skipped instead of failing to plan shards."""
+    assert plan_shards([], 4) == []
+    output = tmp_path / "clean.parquet"
+    assert clean_retail_exports_parallel(str(tmp_path), str(output), workers=2) == {"rows_read": 0, "rows_written": 0}
+    assert not output.exists()
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from refresh import RefreshScheduler
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+class Loader:
+    """Loader returning 1, 2, 3... that can be told to fail or to block until released."""
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+    def __call__(self, current):
+        self.release.wait(5)
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("source down")
+        return self.calls
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def test_preload_loads_every_source(clock):
+    """Test preloading fills every source before the first read."""
+    scheduler = RefreshScheduler(max_age=60, clock=clock)
+    scheduler.register("retail", Loader())
+    scheduler.register("fake_store", Loader())
+    scheduler.preload(wait=True)
+    assert scheduler.is_ready("retail") and scheduler.is_ready("fake_store")
+    assert scheduler.get("retail") == 1 and scheduler.version("retail").number == 1
+
+def test_stale_reads_serve_current_version_while_reloading(clock):
+    """Test a stale read returns the old value at once and the new one is swapped in after the reload."""
+    loader = Loader()
+    scheduler = RefreshScheduler(max_age=60, clock=clock)
+    scheduler.register("retail", loader)
+    scheduler.refresh("retail")
+    clock.now = 61
+    loader.release.clear()
+    assert scheduler.get("retail") == 1
+    assert scheduler.get("retail") == 1
+    loader.release.set()
+    for thread in threading.enumerate():
+        if thread.name == "refresh-retail":
+            thread.join()
+    assert loader.calls == 2
+    assert scheduler.get("retail") == 2 and not scheduler.is_stale("retail")
+
+def test_failed_reload_keeps_last_good_version(clock):
+    """Test a failing reload is recorded, the old value stays and the source is retried later."""
+    loader = Loader()
+    scheduler = RefreshScheduler(max_age=60, retry_after=30, clock=clock)
+    scheduler.register("retail", loader)
+    scheduler.refresh("retail")
+    loader.fail = True
+    clock.now = 100
+    assert scheduler.refresh("retail") is False
+    assert scheduler.get("retail") == 1
+    assert str(scheduler.last_error("retail")) == "source down"
+    assert scheduler.status()[0]["Failures"] == 1
+    assert not scheduler._due("retail")
+    clock.now = 131
+    loader.fail = False
+    assert scheduler._due("retail") and scheduler.refresh("retail")
+    assert scheduler.get("retail") == 3 and scheduler.last_error("retail") is None
+
+def test_unchanged_value_keeps_version(clock):
+    """Test a loader returning the current value only renews its age."""
+    scheduler = RefreshScheduler(max_age=60, clock=clock)
+    value = object()
+    scheduler.register("retail", lambda current: current or value)
+    scheduler.refresh("retail")
+    clock.now = 90
+    assert scheduler.refresh("retail") is False
+    assert scheduler.version("retail").number == 1 and scheduler.version("retail").loaded_at == 90
+
+def test_first_load_failure_is_raised_to_readers(clock):
+    """Test readers of a source that never loaded get the load error."""
+    loader = Loader()
+    loader.fail = True
+    scheduler = RefreshScheduler(clock=clock)
+    scheduler.register("retail", loader)
+    with pytest.raises(RuntimeError, match="source down"):
+        scheduler.get("retail", timeout=5)
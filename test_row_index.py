@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from row_index import RowIndex, sort_for_index
+from schema import apply_retail_schema
+
+@pytest.fixture
+def index(sales_rows):
+    return RowIndex(apply_retail_schema(sort_for_index(sales_rows)))
+
+def test_store_rows_are_contiguous_slices(index, sales_rows):
+    """Test that each store maps to one range matching a boolean filter."""
+    assert index.store_ranges == {"Austin": (0, 3), "Boston": (3, 5)}
+    austin = index.store_rows("Austin")
+    assert np.shares_memory(austin["sales_revenue"].to_numpy(), index.frame["sales_revenue"].to_numpy())
+    expected = sales_rows[sales_rows["store_location"] == "Austin"]
+    assert sorted(austin["sales_revenue"]) == sorted(expected["sales_revenue"])
+    assert index.store_rows("Nowhere").empty
+
+def test_category_ranges(index):
+    """Test the (store, category) sub-ranges and the distinct categories."""
+    assert index.pair_ranges[("Austin", "Electronics")] == (1, 3)
+    assert index.categories == ["Clothing", "Electronics"]
+
+def test_unsorted_frame_rejected(sales_rows):
+    """Test that offsets are never built over an unsorted frame."""
+    with pytest.raises(ValueError):
+        RowIndex(sales_rows)
@@ -0,0 +1,77 @@
+import datetime
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from scd2 import (PRODUCT_DIMENSION, STORE_DIMENSION, dimension_as_of, main, merge_dimension, product_source,
+                  store_source)
+from synthetic_data import generate_fake_store
+
+DAY_1, DAY_2, DAY_3 = datetime.date(2024, 1, 1), datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def products():
+    return generate_fake_store(products=6)["products"]
+
+def versions(conn, dimension):
+    return pd.read_sql_query(f"SELECT * FROM {dimension.table} ORDER BY {dimension.surrogate_key}", conn)
+
+def test_first_load_inserts_current_versions(conn, products):
+    """Test that every key starts with one open version."""
+    stats = merge_dimension(conn, PRODUCT_DIMENSION, product_source(products), DAY_1)
+    assert stats == {"inserted": 6, "updated": 0, "unchanged": 0}
+    rows = versions(conn, PRODUCT_DIMENSION)
+    assert rows["is_current"].tolist() == [1] * 6
+    assert set(rows["valid_from"]) == {"2024-01-01"} and set(rows["valid_to"]) == {"9999-12-31"}
+
+def test_reload_touches_only_changed_rows(conn, products):
+    """Test that a changed price closes the old version and opens a new one; unchanged rows stay put."""
+    merge_dimension(conn, PRODUCT_DIMENSION, product_source(products), DAY_1)
+    products[2] = dict(products[2], price=products[2]["price"] + 5)
+    products.append(dict(products[0], id=99, title="New product"))
+    stats = merge_dimension(conn, PRODUCT_DIMENSION, product_source(products), DAY_2)
+    assert stats == {"inserted": 1, "updated": 1, "unchanged": 5}
+
+    rows = versions(conn, PRODUCT_DIMENSION)
+    history = rows[rows["product_id"] == products[2]["id"]]
+    assert history["valid_to"].tolist() == ["2024-01-02", "9999-12-31"]
+    assert history["is_current"].tolist() == [0, 1]
+    assert history["price"].iloc[-1] == pytest.approx(products[2]["price"])
+    assert merge_dimension(conn, PRODUCT_DIMENSION, product_source(products), DAY_3)["unchanged"] == 7
+    assert len(versions(conn, PRODUCT_DIMENSION)) == 8
+
+def test_as_of_lookup_returns_the_version_in_force(conn, products):
+    """Test point-in-time reads across a change."""
+    original = products[0]["price"]
+    merge_dimension(conn, PRODUCT_DIMENSION, product_source(products), DAY_1)
+    products[0] = dict(products[0], price=original * 2)
+    merge_dimension(conn, PRODUCT_DIMENSION, product_source(products), DAY_2)
+    assert dimension_as_of(conn, PRODUCT_DIMENSION, DAY_1)["price"].iloc[0] == pytest.approx(original)
+    assert dimension_as_of(conn, PRODUCT_DIMENSION, DAY_2)["price"].iloc[0] == pytest.approx(original * 2)
+    assert len(dimension_as_of(conn, PRODUCT_DIMENSION, DAY_2)) == 6
+
+def test_bulk_batches_and_partial_extracts(conn, sales_rows):
+    """Test batched writes and that keys missing from a daily extract stay open."""
+    stats = merge_dimension(conn, STORE_DIMENSION, store_source(sales_rows), DAY_1, batch_size=1)
+    assert stats == {"inserted": 2, "updated": 0, "unchanged": 0}
+    stats = merge_dimension(conn, STORE_DIMENSION, pd.DataFrame({"store_location": ["Boston", "Chicago"]}), DAY_2)
+    assert stats == {"inserted": 1, "updated": 0, "unchanged": 1}
+    assert dimension_as_of(conn, STORE_DIMENSION, DAY_2)["store_location"].tolist() == ["Austin", "Boston", "Chicago"]
+
+def test_cli_loads_both_dimensions(tmp_path, products, sales_rows):
+    """Test the command line entry point against a database file."""
+    products_path, retail_path, database = tmp_path / "products.json", tmp_path / "retail.csv", tmp_path / "dw.db"
+    products_path.write_text(json.dumps(products))
+    sales_rows.to_csv(retail_path, index=False)
+    main([str(database), "--products", str(products_path), "--retail", str(retail_path), "--as-of", "2024-01-01"])
+    with sqlite3.connect(database) as conn:
+        assert len(versions(conn, PRODUCT_DIMENSION)) == 6
+        assert len(versions(conn, STORE_DIMENSION)) == 2
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from schema import apply_retail_schema
+
+def test_columns_are_typed_once(sales_rows):
+    """Test categoricals, parsed dates and downcast integers."""
+    typed = apply_retail_schema(sales_rows)
+    assert isinstance(typed["store_location"].dtype, pd.CategoricalDtype)
+    assert typed["day_of_the_week"].cat.ordered
+    assert list(typed["day_of_the_week"].cat.categories[:3]) == ["Monday", "Tuesday", "Wednesday"]
+    assert typed["date"].dtype == "datetime64[ns]"
+    assert typed["units_sold"].dtype == "int8"
+    assert typed["sales_revenue"].dtype == "float32"
+    assert typed["sales_revenue"].sum() == sales_rows["sales_revenue"].sum()
+    assert typed.memory_usage(deep=True).sum() < sales_rows.memory_usage(deep=True).sum()
+
+def test_inexact_floats_keep_double_precision(sales_rows):
+    """Test that float32 is only used when it stores the values exactly."""
+    sales_rows["marketing_spend"] = [10.1, 5.2, 7.3, 3.4, 2.5]
+    typed = apply_retail_schema(sales_rows)
+    assert typed["marketing_spend"].dtype == "float64"
+
+def test_frame_is_read_only(sales_rows):
+    """Test that in-place writes into the shared frame are rejected."""
+    typed = apply_retail_schema(sales_rows)
+    with pytest.raises(ValueError):
+        typed.loc[0, "sales_revenue"] = 0.0
+    with pytest.raises(ValueError):
+        typed.loc[0, "store_location"] = "Boston"
+    filtered = typed[typed["store_location"] == "Austin"]
+    assert len(filtered.assign(sales_revenue=0.0)) == 3
+    assert sales_rows.loc[0, "sales_revenue"] == 100.0
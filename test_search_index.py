@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from search_index import SubstringIndex
+
+NAMES = ["Fjallraven Backpack", "Mens Casual T-Shirt", "Mens Cotton Jacket", None,
+         "Solid Gold Petite Micropave", "mens casual t-shirt", "WD 2TB Elements Portable Hard Drive"]
+
+@pytest.fixture
+def index():
+    return SubstringIndex(NAMES)
+
+@pytest.mark.parametrize("term", ["mens", "CASUAL", "t-shirt", "ack", "a", "e", "2tb el", "zzz", "drive"])
+def test_matches_str_contains(index, term):
+    """Test that index lookups agree with a full-column str.contains scan."""
+    expected = pd.Series(NAMES).str.lower().str.contains(term.lower(), regex=False, na=False)
+    assert index.search(term).tolist() == expected[expected].index.tolist()
+
+def test_distinct_values_indexed_once(index):
+    """Test that repeated values share one entry and empty terms match every row."""
+    assert len(index.values) == 6
+    assert len(index) == len(NAMES)
+    assert index.search("").tolist() == list(range(len(NAMES)))
+
+def test_candidates_narrowed_by_trigrams(index):
+    """Test that only values sharing every trigram of the term are confirmed."""
+    assert [index.values[i] for i in index.matching_values("cotton")] == ["mens cotton jacket"]
+    assert len(index.matching_values("jacketx")) == 0
@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from schema import apply_retail_schema
+from shared_cache import FileLock, SharedDatasetStore
+
+def build_in_worker(args):
+    """Process-pool worker: map a version, recording in ``builds_dir`` whenever this process had to build it."""
+    root, builds_dir, frame = args
+
+    def build():
+        open(os.path.join(builds_dir, str(os.getpid())), "w").close()
+        time.sleep(0.2)
+        return {"sales": frame}
+
+    return len(SharedDatasetStore(root).get_or_build("retail", "v1", build)["sales"])
+
+def test_round_trip_maps_read_only_columns(tmp_path, sales_rows):
+    """Test that stored frames come back equal, typed and backed by the mapped file."""
+    store = SharedDatasetStore(str(tmp_path))
+    frame = apply_retail_schema(sales_rows)
+    loaded = store.put("retail", "retail:v1", {"sales": frame})["sales"]
+    pd.testing.assert_frame_equal(loaded, frame)
+    assert not loaded["sales_revenue"].to_numpy().flags.writeable
+    assert store.latest("retail").version == "retail:v1"
+    assert store.get("retail", "retail:v2") is None
+
+def test_get_or_build_builds_once_across_processes(tmp_path, sales_rows):
+    """Test single-flight builds: concurrent processes wait for one build and map its result."""
+    builds = tmp_path / "builds"
+    builds.mkdir()
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        sizes = list(pool.map(build_in_worker, [(str(tmp_path / "store"), str(builds), sales_rows)] * 3))
+    assert sizes == [len(sales_rows)] * 3
+    assert len(os.listdir(builds)) == 1
+
+def test_fetch_shared_reuses_fresh_versions(tmp_path, sales_rows):
+    """Test that the source is only fetched again once the stored version is older than max_age."""
+    store = SharedDatasetStore(str(tmp_path))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return f"v{len(calls)}", {"products": sales_rows}
+
+    assert store.fetch_shared("fake_store", 60, fetch)[0] == "v1"
+    assert store.fetch_shared("fake_store", 60, fetch)[0] == "v1"
+    assert store.fetch_shared("fake_store", -1, fetch)[0] == "v2"
+    assert len(calls) == 2
+
+def test_old_versions_are_pruned(tmp_path, sales_rows):
+    """Test that only the newest versions are kept on disk."""
+    store = SharedDatasetStore(str(tmp_path), keep_versions=2)
+    for version in ("v1", "v2", "v3"):
+        store.put("retail", version, {"sales": sales_rows})
+    assert store.get("retail", "v1") is None
+    assert store.get("retail", "v2") is not None and store.get("retail", "v3") is not None
+
+def test_file_lock_times_out_and_breaks_stale_locks(tmp_path):
+    """Test waiting on a held lock and recovering one left behind by a crashed process."""
+    path = str(tmp_path / "retail.lock")
+    with FileLock(path):
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+    assert not os.path.exists(path)
+    open(path, "w").close()
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    with FileLock(path, timeout=1, stale_after=60):
+        assert os.path.exists(path)
+
+def test_file_lock_stays_fresh_while_held(tmp_path):
+    """Test that a holder outliving stale_after keeps its lock, and release spares a lock it no longer holds."""
+    path = str(tmp_path / "retail.lock")
+    with FileLock(path, stale_after=0.3):
+        time.sleep(0.6)
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.3, stale_after=0.3).acquire()
+    assert not os.path.exists(path)
+    lock = FileLock(path)
+    lock.acquire()
+    with open(path, "w") as f:
+        f.write("another-holder")
+    lock.release()
+    assert open(path).read() == "another-holder"
+
+def test_orphaned_writes_are_pruned(tmp_path, sales_rows):
+    """Test that a temporary version directory left by a crashed writer is removed."""
+    store = SharedDatasetStore(str(tmp_path), stale_lock_after=60)
+    store.put("retail", "v1", {"sales": sales_rows})
+    orphan = tmp_path / "retail" / "0123456789abcdef.tmp-99999"
+    orphan.mkdir()
+    fresh = tmp_path / "retail" / "fedcba9876543210.tmp-99998"
+    fresh.mkdir()
+    os.utime(orphan, (time.time() - 120, time.time() - 120))
+    store.put("retail", "v2", {"sales": sales_rows})
+    assert not orphan.exists() and fresh.exists()
+    assert store.get("retail", "v1") is not None
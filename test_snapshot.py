@@ -0,0 +1,87 @@
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from shared_cache import SharedDatasetStore
+from snapshot import RetailSnapshot, share_snapshot
+
+def make_rows(days, store="Austin"):
+    dates = [datetime.date(2024, 1, day) for day in days]
+    return pd.DataFrame({
+        "store_location": [store] * len(dates),
+        "date": dates,
+        "sales_revenue": [float(day) for day in days],
+    })
+
+def share_in_worker(args):
+    """Process-pool worker: append ``days`` one refresh at a time (none for readers), mapping the snapshot after each.
+
+    Returns the (rows in version, rows mapped) pairs it saw.
+    """
+    snapshot_dir, store_dir, days = args
+    snapshot = RetailSnapshot(snapshot_dir, max_parts=2)
+    store = SharedDatasetStore(store_dir)
+    seen = []
+    for day in days or [None] * 20:
+        refresh = (lambda: snapshot.refresh(lambda watermark: make_rows([day]))) if day else (lambda: None)
+        version, frames = share_snapshot(snapshot, store, "retail", refresh, lambda rows: {"sales": rows})
+        seen.append((int(version.rsplit("/", 1)[1]), len(frames["sales"])))
+    return seen
+
+class FakeSource:
+    """Stands in for BigQuery: returns the rows newer than the requested watermark."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.watermarks = []
+
+    def __call__(self, watermark):
+        self.watermarks.append(watermark)
+        if watermark is None:
+            return self.rows
+        return self.rows[self.rows["date"] > watermark]
+
+def test_first_refresh_loads_full_table(tmp_path):
+    """Test that an empty snapshot asks for the full table and records the watermark."""
+    snapshot = RetailSnapshot(str(tmp_path))
+    source = FakeSource(make_rows([1, 2, 3]))
+    assert snapshot.load().empty
+    assert snapshot.refresh(source) == 3
+    assert source.watermarks == [None]
+    assert snapshot.watermark == datetime.date(2024, 1, 3)
+    assert len(snapshot.load()) == 3
+
+def test_refresh_appends_only_newer_rows(tmp_path):
+    """Test incremental refresh past the high-water mark."""
+    snapshot = RetailSnapshot(str(tmp_path))
+    source = FakeSource(make_rows([1, 2]))
+    snapshot.refresh(source)
+    source.rows = pd.concat([source.rows, make_rows([3, 4], store="Boston")], ignore_index=True)
+    assert snapshot.refresh(source) == 2
+    assert source.watermarks[-1] == datetime.date(2024, 1, 2)
+    assert snapshot.metadata["parts"] == 2
+    loaded = snapshot.load()
+    assert sorted(loaded["sales_revenue"]) == [1.0, 2.0, 3.0, 4.0]
+    assert snapshot.refresh(source) == 0
+    assert snapshot.metadata["parts"] == 2
+
+def test_staleness_and_compaction(tmp_path):
+    """Test that parts are folded together once the part limit is exceeded."""
+    snapshot = RetailSnapshot(str(tmp_path), max_parts=2)
+    assert snapshot.is_stale(60)
+    source = FakeSource(make_rows([1]))
+    for day in range(2, 5):
+        snapshot.refresh(source)
+        source.rows = pd.concat([source.rows, make_rows([day])], ignore_index=True)
+    assert not snapshot.is_stale(60)
+    assert snapshot.metadata["parts"] == 1
+    assert sorted(snapshot.load()["sales_revenue"]) == [1.0, 2.0, 3.0]
+def test_share_snapshot_maps_the_rows_of_its_version_across_processes(tmp_path):
+    """Test that readers never map rows from a different version while another process appends and compacts."""
+    snapshot_dir, store_dir = str(tmp_path / "snapshot"), str(tmp_path / "store")
+    jobs = [(snapshot_dir, store_dir, list(range(1, 21)))] + [(snapshot_dir, store_dir, None)] * 2
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        seen = [pair for pairs in pool.map(share_in_worker, jobs) for pair in pairs]
+    assert all(version_rows == mapped_rows for version_rows, mapped_rows in seen)
+    assert RetailSnapshot(snapshot_dir).metadata["rows"] == 20
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from benchmarks import bench_dashboard
+from benchmarks.bench_dashboard import find_regressions, missing_baselines
+from cart_engine import build_cart_lines, cart_totals, price_cart_lines
+from cube import build_cube
+from Data_Preprocessing import clean_retail_export
+from row_index import sort_for_index
+from schema import apply_retail_schema
+from synthetic_data import generate_fake_store, generate_raw_export, generate_retail_sales
+
+def test_retail_sales_is_deterministic():
+    """Test the same seed gives the same frame and a different seed does not."""
+    pd.testing.assert_frame_equal(generate_retail_sales(500, seed=3), generate_retail_sales(500, seed=3))
+    assert not generate_retail_sales(500, seed=3).equals(generate_retail_sales(500, seed=4))
+
+def test_retail_sales_feed_the_dashboard_pipeline():
+    """Test generated rows go through schema, index sort and cube like the BigQuery table."""
+    frame = generate_retail_sales(2_000)
+    assert set(frame.columns) == {"product_id", "store_location", "category", "date", "day_of_the_week",
+                                  "sales_revenue", "marketing_spend", "units_sold"}
+    assert (frame["date"].dt.day_name() == frame["day_of_the_week"]).all()
+    assert frame.groupby("product_id")["category"].nunique().max() == 1
+    cube = build_cube(apply_retail_schema(sort_for_index(frame)))
+    assert abs(cube.query(["sales_revenue"])["sales_revenue"].iloc[0] - frame["sales_revenue"].sum()) < 1e-6
+
+def test_raw_export_cleans_to_retail_columns(tmp_path):
+    """Test the raw export has duplicates and gaps that Data_Preprocessing removes."""
+    export = generate_raw_export(5_000)
+    export.to_csv(tmp_path / "export.csv", index=False)
+    stats = clean_retail_export(str(tmp_path / "export.csv"), str(tmp_path / "clean.parquet"))
+    cleaned = pd.read_parquet(tmp_path / "clean.parquet")
+    expected = len(export.dropna().drop_duplicates())
+    assert stats == {"rows_read": 5_000, "rows_written": expected}
+    assert expected < 5_000 - 100
+    assert {"category", "sales_revenue", "marketing_spend"} <= set(cleaned.columns)
+
+def test_fake_store_payloads_price_every_cart_line():
+    """Test generated carts only reference generated products."""
+    payload = generate_fake_store(products=30, carts=50, users=5)
+    products = pd.DataFrame(payload["products"]).rename(
+        columns={"id": "Product ID", "title": "Product Name", "price": "Price"})
+    priced = price_cart_lines(build_cart_lines(payload["carts"]), products)
+    assert priced["Product Price"].notna().all()
+    assert len(cart_totals(priced)) == 50
+    assert {user["id"] for user in payload["users"]} >= set(priced["User ID"])
+
+def test_regressions_respect_tolerances():
+    """Test only cases past the time or memory tolerance are reported."""
+    baselines = {"fast": {"seconds": 1.0, "peak_mb": 100.0}, "slow": {"seconds": 1.0, "peak_mb": 100.0},
+                 "heavy": {"seconds": 1.0, "peak_mb": 100.0}}
+    results = {"fast": {"seconds": 1.4, "peak_mb": 120.0}, "slow": {"seconds": 1.6, "peak_mb": 100.0},
+               "heavy": {"seconds": 1.0, "peak_mb": 130.0}, "new": {"seconds": 9.0, "peak_mb": 900.0}}
+    regressions = find_regressions(results, baselines, time_tolerance=1.5, memory_tolerance=1.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slow:") and regressions[1].startswith("heavy:")
+    assert missing_baselines(results, baselines) == ["new"]
+def test_missing_baseline_fails_unless_updating(tmp_path, monkeypatch, capsys):
+    """Test that a case without a baseline fails the comparison run until --update records one."""
+    monkeypatch.setattr(bench_dashboard, "BASELINES", str(tmp_path / "baselines.json"))
+    monkeypatch.setattr(bench_dashboard, "build_cases", lambda rows, export_rows, work_dir: [("noop", lambda: None)])
+    assert bench_dashboard.main(["--size", "20k", "--repeats", "1"]) == 1
+    assert "WARNING noop: no 20k baseline" in capsys.readouterr().out
+    assert bench_dashboard.main(["--size", "20k", "--repeats", "1", "--update"]) == 0
+    assert bench_dashboard.main(["--size", "20k", "--repeats", "1", "--time-tolerance", "1000"]) == 0
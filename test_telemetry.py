@@ -0,0 +1,91 @@
+import json
+import threading
+
+import pytest
+
+import telemetry
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "retail_dashboard.log"
+    telemetry.log_to(str(path))
+    yield path
+    for handler in list(telemetry.logger.handlers):
+        if getattr(handler, "baseFilename", None) == str(path):
+            telemetry.logger.removeHandler(handler)
+            handler.close()
+
+def records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_log_path_is_read_from_the_environment_when_logging_starts(tmp_path, monkeypatch):
+    """Test that RETAIL_DASHBOARD_LOG set after import still redirects the span log."""
+    path = tmp_path / "redirected.log"
+    monkeypatch.setenv("RETAIL_DASHBOARD_LOG", str(path))
+    telemetry.log_to()
+    try:
+        trace = telemetry.start_rerun("Retail Dashboard")
+        trace.finish()
+        assert records(path)[-1]["stage"] == "rerun"
+    finally:
+        for handler in list(telemetry.logger.handlers):
+            if getattr(handler, "baseFilename", None) == str(path):
+                telemetry.logger.removeHandler(handler)
+                handler.close()
+
+def test_spans_are_logged_as_json(log_path):
+    """Test each span is one JSON line tagged with the rerun, and the rerun total comes last."""
+    trace = telemetry.start_rerun("Retail Dashboard", session="abc")
+    with trace.span("aggregate", "sales_trend", rows=3):
+        with trace.span("render", "sales_trend"):
+            pass
+    trace.finish()
+    logged = records(log_path)
+    assert [(r["stage"], r.get("depth")) for r in logged] == [("render", 1), ("aggregate", 0), ("rerun", None)]
+    assert {r["rerun"] for r in logged} == {trace.rerun}
+    assert logged[1]["rows"] == 3 and logged[1]["session"] == "abc"
+    assert logged[1]["ms"] >= logged[0]["ms"]
+    assert trace.breakdown()["Stage"].tolist() == ["aggregate", "  render"]
+
+def test_failed_span_records_the_error(log_path):
+    """Test a span still closes and names the exception when its block raises."""
+    trace = telemetry.start_rerun("Retail Dashboard")
+    with pytest.raises(ValueError):
+        with trace.span("fetch", "bigquery"):
+            raise ValueError("boom")
+    assert records(log_path)[0]["error"] == "ValueError"
+
+def test_cache_lookups_count_hits_and_misses(log_path):
+    """Test a lookup is a hit unless marked a miss, and nested lookups are counted separately."""
+    trace = telemetry.start_rerun("Retail Dashboard")
+    with trace.cache_lookup("test_outer"):
+        with trace.cache_lookup("test_inner"):
+            trace.mark_cache_miss()
+        trace.mark_cache_miss()
+    with trace.cache_lookup("test_outer"):
+        pass
+    assert trace.cache == {"test_outer": {"hits": 1, "misses": 1}, "test_inner": {"hits": 0, "misses": 1}}
+    assert [r.get("cache") for r in records(log_path)] == ["miss", "miss", "hit"]
+
+    before = telemetry.cache_totals()["test_inner"]
+    next_trace = telemetry.start_rerun("Retail Dashboard")
+    with next_trace.cache_lookup("test_inner"):
+        pass
+    assert next_trace.cache == {"test_inner": {"hits": 1, "misses": 0}}
+    assert telemetry.cache_totals()["test_inner"] == {"hits": before["hits"] + 1, "misses": before["misses"]}
+    table = next_trace.cache_table().set_index("Cache")
+    assert table.loc["test_outer", "Hits"] == 0 and table.loc["test_inner", "Server Hits"] == before["hits"] + 1
+
+def test_traced_job_logs_its_own_rerun(log_path):
+    """Test a background job gets a trace of its own, closed when the job ends."""
+    @telemetry.traced_job("refresh:retail")
+    def load():
+        with telemetry.current_trace().span("fetch", "bigquery"):
+            return 42
+
+    thread = threading.Thread(target=load)
+    thread.start()
+    thread.join()
+    logged = records(log_path)
+    assert [r["stage"] for r in logged] == ["fetch", "rerun"]
+    assert {r["page"] for r in logged} == {"refresh:retail"}
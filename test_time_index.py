@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from row_index import sort_for_index
+from schema import apply_retail_schema
+from time_index import TimeIndex
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(7)
+    rows = 2_000
+    return apply_retail_schema(sort_for_index(pd.DataFrame({
+        "product_id": rng.integers(1, 20, rows),
+        "store_location": rng.choice(["Austin", "Boston", "Chicago"], rows),
+        "category": rng.choice(["Clothing", "Electronics", "Toys"], rows),
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 400, rows) * 2, unit="D"),
+        "day_of_the_week": "Monday",
+        "sales_revenue": rng.uniform(1, 500, rows).round(2),
+        "marketing_spend": rng.uniform(0, 50, rows),
+        "units_sold": rng.integers(1, 10, rows),
+    })))
+
+def test_range_totals_match_a_scan(sales):
+    """Test overall, store and category totals against filtering the rows."""
+    index = TimeIndex(sales)
+    for start, end in [("2023-02-01", "2023-02-01"), ("2023-02-02", "2023-02-02"), ("2023-03-15", "2024-06-30"), (None, None)]:
+        rows = sales[(sales["date"] >= (start or "1900")) & (sales["date"] <= (end or "2100"))]
+        assert index.total(start, end) == pytest.approx(rows["sales_revenue"].sum())
+        assert index.total(start, end, store_location="Boston") == pytest.approx(
+            rows.loc[rows["store_location"] == "Boston", "sales_revenue"].sum())
+        assert index.total(start, end, category="Toys") == pytest.approx(
+            rows.loc[rows["category"] == "Toys", "sales_revenue"].sum())
+
+def test_trends_match_resampling(sales):
+    """Test daily, weekly and monthly trends against pandas resampling of the rows."""
+    index = TimeIndex(sales)
+    rows = sales[(sales["date"] >= "2023-03-10") & (sales["date"] <= "2023-09-20") & (sales["category"] == "Electronics")]
+    for granularity, rule in [("D", "D"), ("W", "W-MON"), ("M", "MS")]:
+        trend = index.trend("2023-03-10", "2023-09-20", granularity, category="Electronics")
+        expected = rows.resample(rule, on="date", label="left", closed="left")["sales_revenue"].sum()
+        if granularity == "D":
+            expected = expected.reindex(pd.date_range("2023-03-10", "2023-09-20"), fill_value=0.0)
+        assert trend["date"].tolist() == expected.index.tolist()
+        assert trend["sales_revenue"].to_numpy() == pytest.approx(expected.to_numpy())
+    assert index.trend(granularity="W")["date"].dt.dayofweek.eq(0).all()
+
+def test_ranges_outside_the_data_and_unknown_values(sales):
+    """Test empty ranges, unknown stores, invalid filters and an empty frame."""
+    index = TimeIndex(sales)
+    assert index.total("2030-01-01", "2030-12-31") == 0.0
+    assert index.total("2023-06-01", "2023-05-01") == 0.0
+    assert index.trend("2030-01-01", "2030-12-31", "M").empty
+    assert index.total(store_location="Denver") == 0.0
+    assert list(index.labels("store_location")) == ["Austin", "Boston", "Chicago"]
+    with pytest.raises(ValueError):
+        index.total(store_location="Austin", category="Toys")
+    with pytest.raises(ValueError):
+        index.trend(granularity="Q")
+    empty = TimeIndex(sales.iloc[:0])
+    assert empty.total() == 0.0 and empty.trend(granularity="W").empty
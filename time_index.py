@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ("store_location", "category")
+
+# Trend granularities: days, weeks starting on Monday, calendar months
+GRANULARITIES = {"D": "Daily", "W": "Weekly", "M": "Monthly"}
+
+
+def _codes(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(dtype=np.int64), values.cat.categories
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+def _day(value):
+    return pd.Timestamp(value).to_datetime64().astype("datetime64[D]")
+
+
+class TimeIndex:
+    """Cumulative daily totals of one measure, overall and per store and per category.
+
+    Days form a dense calendar from the first to the last date of the frame
+    (days without sales total zero), so a date range is two binary searches
+    and its total the difference of two prefix sums. Trends are cut from the
+    same prefix sums at day, week or month boundaries, so changing the range
+    or the granularity never touches the rows again. Building the index is
+    one ``np.bincount`` pass per dimension.
+    """
+
+    def __init__(self, frame, measure="sales_revenue", dimensions=DIMENSIONS):
+        self.measure = measure
+        dates = pd.to_datetime(frame["date"]).to_numpy(dtype="datetime64[D]") if "date" in frame else \
+            np.array([], dtype="datetime64[D]")
+        present = ~np.isnat(dates)
+        if present.any():
+            first = dates[present].min()
+            self.days = np.arange(first, dates[present].max() + 1)
+        else:
+            first = np.datetime64("1970-01-01", "D")
+            self.days = np.array([], dtype="datetime64[D]")
+        n = len(self.days)
+        positions = np.where(present, (dates - first).astype(np.int64), 0)
+        weights = frame[measure].to_numpy(dtype=np.float64, na_value=0.0) if len(dates) else np.array([])
+
+        self._labels = {}
+        self._prefix = {None: self._cumulative(np.bincount(positions[present], weights[present], minlength=n))}
+        for dimension in dimensions:
+            if dimension not in frame:
+                continue
+            codes, labels = _codes(frame[dimension])
+            keep = present & (codes >= 0)
+            daily = np.bincount(codes[keep] * n + positions[keep], weights[keep], minlength=len(labels) * n)
+            self._labels[dimension] = labels
+            self._prefix[dimension] = self._cumulative(daily.reshape(len(labels), n))
+
+    @staticmethod
+    def _cumulative(daily):
+        # Leading zero so the total of days [i, j) is prefix[j] - prefix[i]
+        return np.concatenate([np.zeros(daily.shape[:-1] + (1,)), np.cumsum(daily, axis=-1)], axis=-1)
+
+    @property
+    def nbytes(self):
+        return sum(prefix.nbytes for prefix in self._prefix.values()) + self.days.nbytes
+
+    def labels(self, dimension):
+        """The values of ``dimension`` that have their own series."""
+        return self._labels[dimension]
+
+    def _series(self, filters):
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if not filters:
+            return self._prefix[None]
+        if len(filters) > 1:
+            raise ValueError(f"Time index series are per single dimension, got {sorted(filters)}")
+        (dimension, value), = filters.items()
+        position = self._labels[dimension].get_indexer([value])[0]
+        if position < 0:
+            return np.zeros(len(self.days) + 1)
+        return self._prefix[dimension][position]
+
+    def _bounds(self, start, end):
+        lo = 0 if start is None else int(np.searchsorted(self.days, _day(start), "left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, _day(end), "right"))
+        return lo, max(lo, hi)
+
+    def total(self, start=None, end=None, **filters):
+        """Sum of the measure from ``start`` to ``end`` (inclusive), optionally for one store or category."""
+        prefix = self._series(filters)
+        lo, hi = self._bounds(start, end)
+        return float(prefix[hi] - prefix[lo])
+
+    def trend(self, start=None, end=None, granularity="D", **filters):
+        """Totals per day, week or month from ``start`` to ``end`` as ``date`` and measure columns.
+
+        Periods are labelled by their first day; a week or month cut by the
+        range only counts its days inside the range.
+        """
+        prefix = self._series(filters)
+        lo, hi = self._bounds(start, end)
+        days = self.days[lo:hi]
+        if granularity == "D":
+            starts, labels = np.arange(len(days)), days
+        else:
+            if granularity == "W":
+                # 1970-01-01 was a Thursday; shifting by 3 days starts weeks on Monday
+                periods = (days.astype(np.int64) + 3) // 7
+                period_starts = (periods * 7 - 3).astype("datetime64[D]")
+            elif granularity == "M":
+                periods = days.astype("datetime64[M]")
+                period_starts = periods.astype("datetime64[D]")
+            else:
+                raise ValueError(f"Unknown granularity: {granularity}")
+            starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]]) if len(days) else np.array([], dtype=np.int64)
+            labels = period_starts[starts]
+        edges = lo + starts
+        values = prefix[np.append(edges[1:], hi)] - prefix[edges]
+        return pd.DataFrame({"date": labels.astype("datetime64[ns]"), self.measure: values})